@@ -1,13 +1,32 @@
-from .app import App
-from .input import InputManager
+from importlib import import_module
+
+from . import colors
+from .buffer import PointBuffer
 from .point import Point
-from .renderer import Renderer
-from .window import Window
+
+# these need PyOpenGL or glfw so they're only imported the first time they're used,
+# that way the geometry (points, buffers, curves) can be used without a windowing system
+_GL_EXPORTS = {
+    "App": ".app",
+    "InputManager": ".input",
+    "Renderer": ".renderer",
+    "Window": ".window"
+}
+
+def __getattr__(name):
+    module = _GL_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value # cache it so __getattr__ isn't hit again
+    return value
 
 __all__ = [
     "App",
     "InputManager",
     "Point",
+    "PointBuffer",
     "Renderer",
     "Window"
-]
\ No newline at end of file
+]
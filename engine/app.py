@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from time import perf_counter
 
 import glfw
 
@@ -7,9 +8,9 @@ from .renderer import Renderer
 from .input import InputManager
 
 class App(ABC):
-    def __init__(self, window_width, window_height, window_name, multisample_rate=None):
+    def __init__(self, window_width, window_height, window_name, multisample_rate=None, visible=True):
         # create the window
-        self.window = Window(window_width, window_height, window_name, multisample_rate)
+        self.window = Window(window_width, window_height, window_name, multisample_rate, visible)
         fb_width, fb_height = self.window.get_framebuffer_size() # have to use framebuffer size instead of window size because of hdpi scaling on hdpi monitors like mine
         self.window.set_viewport(fb_width, fb_height)
         self.window.set_ortho(0, fb_width, 0, fb_height, -1, 1)
@@ -20,6 +21,10 @@ class App(ABC):
         # create the input manager
         self.input_manager = InputManager(self.window.window)
 
+        # timings used to keep track of the startup time
+        self.created_at = perf_counter()
+        self.first_frame_at = None
+
     @abstractmethod
     def draw(self):
         """Called each frame."""
@@ -42,12 +47,30 @@ class App(ABC):
                 break  # Exit main loop
 
             # Render scene
-            self.renderer.clear()
+            self.render_frame()
 
-            self.draw()
-            self.window.swap_buffers()
+            if self.first_frame_at is None:
+                self.first_frame_at = perf_counter()
 
+        self.input_manager.stop_recording()
+        self.on_close()
         self.window.terminate()
 
+    def state(self):
+        """A copy of what the app is editing, e.g. for replays to compare. None unless the app overrides it."""
+        return None
+
+    def on_close(self):
+        """Called once when the main loop ends, before the window is destroyed."""
+        pass
+
+    def render_frame(self):
+        """Draws and presents a single frame."""
+        self.renderer.clear()
+
+        self.draw()
+        self.window.swap_buffers()
+        self.input_manager.end_frame()
+
     def __call__(self):
         self.run()
@@ -0,0 +1,36 @@
+import numpy as np
+
+class PointBuffer:
+    """
+    A growable array of 2d points that is meant to be reused frame after frame.
+
+    Only the first `count` rows of `data` are valid. The storage only grows (by doubling)
+    when more room is reserved than is available, so writing the same amount of points
+    every frame doesn't allocate anything.
+    """
+    def __init__(self, capacity: int=64, dtype=np.float32):
+        self.data = np.zeros((max(capacity, 1), 2), dtype=dtype)
+        self.count = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.data.shape[0]
+
+    def reserve(self, capacity: int):
+        """Makes sure the buffer can hold at least `capacity` points. Valid points are kept."""
+        if capacity <= self.capacity:
+            return
+
+        data = np.zeros((max(capacity, 2 * self.capacity), 2), dtype=self.data.dtype)
+        data[:self.count] = self.data[:self.count]
+        self.data = data
+
+    def clear(self):
+        self.count = 0
+
+    def view(self) -> np.ndarray:
+        """Returns a view of the valid points. No data is copied."""
+        return self.data[:self.count]
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,312 @@
+"""
+Bezier and B-spline evaluation.
+
+Curves are evaluated in batches as matrix products: the basis functions sampled at evenly spaced
+parameters form a (resolution + 1, degree + 1) matrix that's multiplied with the control points.
+Those matrices only depend on the degree and the resolution (and the knots for non-uniform B-splines)
+so they are cached. de Casteljau and de Boor are there for one-off points.
+"""
+from math import comb
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided, sliding_window_view
+
+from .buffer import PointBuffer
+
+_bernstein_matrices: dict[tuple, np.ndarray] = {}
+_bspline_matrices: dict[tuple, np.ndarray] = {}
+
+def bernstein_matrix(degree: int, resolution: int, dtype=np.float64) -> np.ndarray:
+    """
+    Returns the (resolution + 1, degree + 1) matrix of Bernstein polynomials sampled at t = 0, 1/resolution, ..., 1.
+    The returned matrix is cached and shared, don't write to it.
+    """
+    key = (degree, resolution, np.dtype(dtype))
+    matrix = _bernstein_matrices.get(key)
+    if matrix is None:
+        t = np.linspace(0, 1, resolution + 1)[:, None]
+        k = np.arange(degree + 1)
+        binomials = np.array([comb(degree, i) for i in k], dtype=np.float64)
+        matrix = (binomials * t ** k * (1 - t) ** (degree - k)).astype(dtype)
+        matrix.flags.writeable = False
+        _bernstein_matrices[key] = matrix
+    return matrix
+
+def evaluate_bezier(control_points, resolution: int=200, out: np.ndarray=None) -> np.ndarray:
+    """
+    Evaluates one or many bezier curves of any degree at resolution + 1 evenly spaced parameters.
+
+    Args:
+        control_points (array like): Shape (degree + 1, 2) for one curve or (curves, degree + 1, 2) for many.
+        resolution (int, optional): How many line segments per curve. Defaults to 200.
+        out (np.ndarray, optional): Where to write the result, must have the right shape.
+
+    Returns:
+        np.ndarray: Shape (resolution + 1, 2) or (curves, resolution + 1, 2).
+    """
+    control_points = np.asarray(control_points)
+    matrix = bernstein_matrix(control_points.shape[-2] - 1, resolution, _float_dtype(control_points))
+    return np.matmul(matrix, control_points, out=out)
+
+def de_casteljau(control_points, t: float) -> np.ndarray:
+    """Evaluates a single point of a bezier curve of any degree with de Casteljau's algorithm."""
+    points = np.array(control_points, dtype=np.float64)
+    for r in range(1, len(points)):
+        points[:-r] = (1 - t) * points[:-r] + t * points[1:len(points) - r + 1]
+    return points[0]
+
+def split_bezier(control_points, t: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Splits a bezier curve of any degree at t with de Casteljau's algorithm.
+    The two halves trace exactly the same curve, the first one from 0 to t and the second one from t to 1.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The control points of both halves, each the same shape as the input.
+    """
+    points = np.array(control_points, dtype=np.float64)
+    left, right = [points[0]], [points[-1]]
+    for r in range(1, len(points)):
+        points = (1 - t) * points[:-1] + t * points[1:]
+        left.append(points[0])
+        right.append(points[-1])
+    return np.array(left), np.array(right[::-1])
+
+def bernstein_basis(degree: int, t) -> np.ndarray:
+    """Evaluates the Bernstein polynomials at arbitrary parameters. The result has shape (len(t), degree + 1)."""
+    t = np.atleast_1d(np.asarray(t, dtype=np.float64))[:, None]
+    k = np.arange(degree + 1)
+    binomials = np.array([comb(degree, i) for i in k], dtype=np.float64)
+    return binomials * t ** k * (1 - t) ** (degree - k)
+
+def hodograph(control_points) -> np.ndarray:
+    """
+    Returns the control points of the derivative of bezier curves, one degree lower.
+    Works on (degree + 1, 2) as well as (curves, degree + 1, 2) arrays.
+    """
+    control_points = np.asarray(control_points, dtype=np.float64)
+    degree = control_points.shape[-2] - 1
+    return degree * np.diff(control_points, axis=-2)
+
+def evaluate_bezier_at(control_points, curves, t) -> np.ndarray:
+    """
+    Evaluates many (curve, t) pairs at once.
+
+    Args:
+        control_points (array like): Shape (curve_count, degree + 1, 2).
+        curves (array like): The index of the curve of every pair.
+        t (array like): The parameter of every pair, same length as curves.
+
+    Returns:
+        np.ndarray: Shape (len(t), 2).
+    """
+    control_points = np.asarray(control_points, dtype=np.float64)
+    basis = bernstein_basis(control_points.shape[-2] - 1, t)
+    return np.einsum("kj,kjd->kd", basis, control_points[np.asarray(curves, dtype=np.intp)])
+
+def cubic_bounding_boxes(control_points) -> np.ndarray:
+    """
+    Computes the exact bounding box of many cubic beziers at once, from the curves' end points and the
+    roots of their derivatives.
+
+    Args:
+        control_points (array like): Shape (curves, 4, 2).
+
+    Returns:
+        np.ndarray: Shape (curves, 4), each row is min x, min y, max x, max y.
+    """
+    p = np.asarray(control_points, dtype=np.float64)
+    p0, p1, p2, p3 = p[:, 0], p[:, 1], p[:, 2], p[:, 3]
+
+    # the derivative divided by 3 is a t^2 + b t + c, per axis
+    a = -p0 + 3 * p1 - 3 * p2 + p3
+    b = 2 * (p0 - 2 * p1 + p2)
+    c = p1 - p0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        root = np.sqrt(b * b - 4 * a * c)
+        quadratic = np.abs(a) > 1e-12
+        t1 = np.where(quadratic, (-b + root) / (2 * a), -c / b)
+        t2 = np.where(quadratic, (-b - root) / (2 * a), -c / b)
+
+    # roots outside of the curve (or complex, or missing) fall back to t = 0 which is already covered
+    candidates = np.stack((t1, t2), axis=1) # (curves, 2 roots, 2 axes)
+    candidates = np.where((candidates > 0) & (candidates < 1), candidates, 0)
+
+    t = candidates[..., None, :] # (curves, 2 roots, 1, 2 axes)
+    s = 1 - t
+    weights = np.concatenate((s ** 3, 3 * s ** 2 * t, 3 * s * t ** 2, t ** 3), axis=2) # (curves, 2 roots, 4, 2 axes)
+    extrema = np.einsum("krja,kja->kra", weights, p) # (curves, 2 roots, 2 axes)
+
+    points = np.concatenate((extrema, p[:, [0, 3]]), axis=1)
+    return np.concatenate((points.min(axis=1), points.max(axis=1)), axis=1)
+
+def flatten_resolution(control_points, tolerance: float=0.25, max_resolution: int=1024) -> int:
+    """
+    How many line segments per curve keep every curve of a batch within `tolerance` of its flattened version
+    (Wang's formula). It's the same count for the whole batch so they can all be evaluated at once.
+
+    Args:
+        control_points (array like): Shape (curves, degree + 1, 2), in the units the tolerance is in.
+        tolerance (float, optional): The largest distance between a curve and its lines. Defaults to 0.25.
+        max_resolution (int, optional): Defaults to 1024.
+    """
+    control_points = np.asarray(control_points, dtype=np.float64)
+    degree = control_points.shape[-2] - 1
+    if degree < 2 or control_points.size == 0:
+        return 1
+
+    second_differences = np.diff(control_points, n=2, axis=-2)
+    bound = np.sqrt(np.einsum("...i,...i->...", second_differences, second_differences).max())
+    resolution = np.ceil(np.sqrt(degree * (degree - 1) * bound / (8 * tolerance)))
+    return int(min(max(resolution, 1), max_resolution))
+
+def tessellate_bezier_chain(buffer: PointBuffer, out: PointBuffer, degree: int=3, resolution: int=200):
+    """
+    Tessellates a chain of bezier curves that share their end points e.g., p0, p1, p2, p3, p4, p5, p6... for cubics.
+    Each curve becomes resolution + 1 consecutive points in `out`. Nothing is allocated unless `out` has to grow.
+
+    Args:
+        buffer (PointBuffer): The control points of the chain.
+        out (PointBuffer): Where the points along the curves are written.
+        degree (int, optional): The degree of every curve in the chain. Defaults to 3.
+        resolution (int, optional): How many line segments per curve. Defaults to 200.
+    """
+    curve_count = max((buffer.count - 1) // degree, 0)
+    strip_length = resolution + 1
+    out.reserve(curve_count * strip_length)
+    out.count = curve_count * strip_length
+    if curve_count == 0:
+        return
+
+    # view the chain as (curve_count, degree + 1, 2) without copying, neighbouring curves overlap by one point
+    row_stride, col_stride = buffer.data.strides
+    control_points = as_strided(
+        buffer.data,
+        shape=(curve_count, degree + 1, 2),
+        strides=(degree * row_stride, row_stride, col_stride),
+        writeable=False
+    )
+    curves = out.data[:out.count].reshape(curve_count, strip_length, 2)
+    np.matmul(bernstein_matrix(degree, resolution, buffer.data.dtype), control_points, out=curves)
+
+def uniform_knots(count: int, degree: int, clamped: bool=False) -> np.ndarray:
+    """
+    Returns a uniform knot vector for `count` control points.
+    Clamped knots repeat the first and last knot degree + 1 times so the curve touches its end points.
+    """
+    if not clamped:
+        return np.arange(count + degree + 1, dtype=np.float64)
+
+    inner = np.arange(1, count - degree, dtype=np.float64)
+    return np.concatenate((np.zeros(degree + 1), inner, np.full(degree + 1, count - degree, dtype=np.float64)))
+
+def bspline_basis(knots, degree: int, span: int, t) -> np.ndarray:
+    """
+    Evaluates the degree + 1 B-spline basis functions that are non zero on knots[span] <= t < knots[span + 1].
+    Vectorized over t, the result has shape (len(t), degree + 1).
+    """
+    knots = np.asarray(knots, dtype=np.float64)
+    t = np.atleast_1d(np.asarray(t, dtype=np.float64))
+
+    basis = np.zeros((len(t), degree + 1))
+    left = np.zeros((len(t), degree + 1))
+    right = np.zeros((len(t), degree + 1))
+    basis[:, 0] = 1
+    for j in range(1, degree + 1):
+        left[:, j] = t - knots[span + 1 - j]
+        right[:, j] = knots[span + j] - t
+        saved = 0
+        for r in range(j):
+            temp = basis[:, r] / (right[:, r + 1] + left[:, j - r])
+            basis[:, r] = saved + right[:, r + 1] * temp
+            saved = left[:, j - r] * temp
+        basis[:, j] = saved
+    return basis
+
+def bspline_matrices(knots, degree: int, resolution: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (spans, matrices) for a knot vector. spans holds the index of every non empty knot span of the curve's domain
+    and matrices[i] is the (resolution + 1, degree + 1) basis matrix of spans[i], sampled evenly over the span.
+    The matrices are cached per (degree, resolution, knots) and shared, don't write to them.
+    """
+    knots = np.asarray(knots, dtype=np.float64)
+    key = (degree, resolution, knots.tobytes())
+    cached = _bspline_matrices.get(key)
+    if cached is not None:
+        return cached
+
+    count = len(knots) - degree - 1
+    spans = np.array([s for s in range(degree, count) if knots[s] < knots[s + 1]], dtype=np.intp)
+    matrices = np.empty((len(spans), resolution + 1, degree + 1))
+    for i, span in enumerate(spans):
+        t = np.linspace(knots[span], knots[span + 1], resolution + 1)
+        # the last sample sits on the next knot, nudge it back so it still belongs to this span
+        t[-1] = np.nextafter(t[-1], t[0])
+        matrices[i] = bspline_basis(knots, degree, span, t)
+    matrices.flags.writeable = False
+    spans.flags.writeable = False
+
+    _bspline_matrices[key] = spans, matrices
+    return spans, matrices
+
+def uniform_bspline_matrix(degree: int, resolution: int) -> np.ndarray:
+    """
+    Returns the (resolution + 1, degree + 1) basis matrix shared by every span of a uniform B-spline.
+    Cached and shared, don't write to it.
+    """
+    _, matrices = bspline_matrices(uniform_knots(2 * degree + 1, degree), degree, resolution)
+    return matrices[degree]
+
+def evaluate_bspline(control_points, degree: int=3, resolution: int=200, knots=None) -> np.ndarray:
+    """
+    Evaluates a B-spline at resolution + 1 evenly spaced parameters per knot span.
+
+    Args:
+        control_points (array like): Shape (count, 2).
+        degree (int, optional): The degree of the B-spline. Defaults to 3.
+        resolution (int, optional): How many line segments per knot span. Defaults to 200.
+        knots (array like, optional): A non decreasing knot vector of length count + degree + 1.
+            Defaults to None i.e., a uniform B-spline.
+
+    Returns:
+        np.ndarray: Shape (spans, resolution + 1, 2), one polyline per non empty knot span.
+    """
+    control_points = np.asarray(control_points, dtype=np.float64)
+    if len(control_points) <= degree:
+        raise ValueError(f"need more than {degree} control points for a degree {degree} B-spline")
+
+    # (count - degree, degree + 1, 2), the control points each span depends on
+    windows = sliding_window_view(control_points, degree + 1, axis=0).swapaxes(1, 2)
+
+    if knots is None:
+        return np.matmul(uniform_bspline_matrix(degree, resolution), windows)
+
+    knots = np.asarray(knots, dtype=np.float64)
+    if len(knots) != len(control_points) + degree + 1:
+        raise ValueError(f"expected {len(control_points) + degree + 1} knots, received {len(knots)}")
+
+    spans, matrices = bspline_matrices(knots, degree, resolution)
+    return np.matmul(matrices, windows[spans - degree])
+
+def de_boor(control_points, t: float, degree: int=3, knots=None) -> np.ndarray:
+    """
+    Evaluates a single point of a B-spline with de Boor's algorithm.
+    Uses a uniform knot vector if none is given, its domain is [degree, count].
+    """
+    control_points = np.asarray(control_points, dtype=np.float64)
+    count = len(control_points)
+    knots = uniform_knots(count, degree) if knots is None else np.asarray(knots, dtype=np.float64)
+
+    span = int(np.searchsorted(knots, t, side="right")) - 1
+    span = min(max(span, degree), count - 1)
+
+    points = control_points[span - degree:span + 1].copy()
+    for r in range(1, degree + 1):
+        for j in range(degree, r - 1, -1):
+            low = knots[j + span - degree]
+            alpha = (t - low) / (knots[j + 1 + span - r] - low)
+            points[j] = (1 - alpha) * points[j - 1] + alpha * points[j]
+    return points[degree]
+
+def _float_dtype(array: np.ndarray):
+    return array.dtype if array.dtype in (np.float32, np.float64) else np.float64
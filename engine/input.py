@@ -1,8 +1,11 @@
 import glfw
 
+from .recording import InputRecorder
+
 class InputManager:
     def __init__(self, window):
         self.window = window
+        self._recorder: InputRecorder | None = None
         self.mouse_clicks = []  # Store mouse clicks
         self.keys_pressed = set()  # Store currently pressed keys
         self.callbacks = {} # Store registered callbacks
@@ -36,6 +39,39 @@ class InputManager:
             for callback in self.callbacks[event_name]:
                 callback(*args, **kwargs)
 
+    def dispatch(self, event_name, *args):
+        """
+        Applies an event to the input state and triggers its callbacks.
+        Every event goes through here, whether it comes from glfw or from a replay, so this is also where it gets recorded.
+        """
+        if self._recorder is not None:
+            self._recorder.write(event_name, args)
+
+        if event_name == "left_release":
+            self.is_dragging = False
+        elif event_name == "key_release":
+            self.keys_pressed.add(args[0])
+
+        self.trigger_callbacks(event_name, *args)
+
+        if event_name == "left_click":
+            self.is_dragging = True
+
+    def start_recording(self, path):
+        """Starts recording every event to a file, see engine.recording."""
+        self.stop_recording()
+        self._recorder = InputRecorder(path)
+
+    def stop_recording(self):
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+
+    def end_frame(self):
+        """Marks the end of a frame in the recording so a replay can batch the events the same way."""
+        if self._recorder is not None:
+            self._recorder.write("frame", ())
+
     def get_scaled_mouse_position(self, x, y):
         """ 
         Convert window coordinates to framebuffer coordinates. 
@@ -57,24 +93,20 @@ class InputManager:
             x, y = self.get_scaled_mouse_position(*glfw.get_cursor_pos(window))
 
             # Trigger any registered left_click callbacks, passing the position
-            self.trigger_callbacks("left_click", x, y)
-
-            self.is_dragging = True
+            self.dispatch("left_click", x, y)
         if button == glfw.MOUSE_BUTTON_LEFT and action == glfw.RELEASE:
-            self.is_dragging = False
             x, y = self.get_scaled_mouse_position(*glfw.get_cursor_pos(window))
-            self.trigger_callbacks("left_release", x, y)
+            self.dispatch("left_release", x, y)
 
     def process_mouse_move(self, window, x, y):
         x_scaled, y_scaled = self.get_scaled_mouse_position(x, y)
-        self.trigger_callbacks("mouse_move", x_scaled, y_scaled)
+        self.dispatch("mouse_move", x_scaled, y_scaled)
 
     def process_keypress(self, window, key, scancode, action, mods):
         if action == glfw.PRESS:
-            self.trigger_callbacks("key_press", key, scancode, mods)
+            self.dispatch("key_press", key, scancode, mods)
         elif action == glfw.RELEASE:
-            self.keys_pressed.add(key)
-            self.trigger_callbacks("key_release", key, scancode, mods)
+            self.dispatch("key_release", key, scancode, mods)
 
     def get_mouse_clicks(self):
         """ Get scaled mouse click positions. """
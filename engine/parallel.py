@@ -0,0 +1,200 @@
+"""
+Multi-process evaluation of very large splines.
+
+The (segments, 4, 2) control point array is put in shared memory once, every worker process attaches to it
+when it starts, and jobs only describe a range of segments and where to write. Results go to shared output
+buffers as well so nothing but a few integers and names is pickled per chunk. The arrays returned are views of
+those buffers, not copies, the memory is released once the last of them is garbage collected.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from .curves import cubic_bounding_boxes, evaluate_bezier
+
+# per worker process state, see _attach
+_segments: np.ndarray | None = None
+_segments_memory: SharedMemory | None = None
+
+class ParallelEvaluator:
+    """
+    Evaluates the segments of a huge spline on a pool of processes.
+
+    Use it as a context manager (or call close()) so the shared memory is released:
+
+        with ParallelEvaluator(spline.segment_control_points()) as evaluator:
+            boxes = evaluator.bounding_boxes()
+    """
+    def __init__(
+            self,
+            control_points,
+            closed: bool=False,
+            workers: int=None,
+            chunks_per_worker: int=4,
+            start_method: str="spawn"
+        ):
+        """
+        Args:
+            control_points (array like): The (segments, 4, 2) control points, see Spline.segment_control_points.
+            closed (bool, optional): Is the spline closed i.e., does its last segment end where the first one starts?
+                Its end is then the same point as its start rather than a point of its own. Defaults to False.
+            workers (int, optional): How many processes. Defaults to the number of cores.
+            chunks_per_worker (int, optional): How many chunks of segments each worker gets, more evens out the load. Defaults to 4.
+            start_method (str, optional): The multiprocessing start method. Defaults to "spawn" since
+                forking a process that runs the editor's threads isn't safe.
+        """
+        control_points = np.asarray(control_points, dtype=np.float64)
+        self.segment_count = len(control_points)
+        self.closed = closed
+        self.workers = workers or os.cpu_count() or 1
+        self.chunks_per_worker = chunks_per_worker
+
+        self._input = SharedMemory(create=True, size=max(control_points.nbytes, 1))
+        np.ndarray(control_points.shape, np.float64, self._input.buf)[:] = control_points
+
+        self._pool = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_attach,
+            initargs=(self._input.name, control_points.shape)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown()
+        self._input.close()
+        self._input.unlink()
+
+    def tessellate(self, resolution: int=200) -> np.ndarray:
+        """Returns the (segments, resolution + 1, 2) points along every segment."""
+        return self._run(_tessellate, (self.segment_count, resolution + 1, 2), resolution)
+
+    def lengths(self, resolution: int=64) -> np.ndarray:
+        """Returns the (segments,) approximate arc lengths, measured along resolution line segments per segment."""
+        return self._run(_lengths, (self.segment_count,), resolution)
+
+    def length(self, resolution: int=64) -> float:
+        return float(self.lengths(resolution).sum())
+
+    def bounding_boxes(self) -> np.ndarray:
+        """Returns the exact (segments, 4) bounding boxes, rows are min x, min y, max x, max y."""
+        return self._run(_bounding_boxes, (self.segment_count, 4))
+
+    def bounding_box(self) -> tuple[float, float, float, float]:
+        boxes = self.bounding_boxes()
+        return (*boxes[:, :2].min(axis=0).tolist(), *boxes[:, 2:].max(axis=0).tolist())
+
+    def intersect_line(self, p, q, resolution: int=64) -> np.ndarray:
+        """
+        Finds where the spline crosses the line segment pq, each segment being flattened to resolution line segments.
+        A flattened point right on the line is one hit, whether the spline crosses there or only touches the line.
+
+        Returns:
+            np.ndarray: (hits, 4) rows of segment index, t, x, y, sorted by segment and t.
+        """
+        p, q = tuple(map(float, p)), tuple(map(float, q))
+        futures = [self._pool.submit(_intersect_line, start, stop, p, q, resolution, self.closed) for start, stop in self._chunks()]
+        hits = [hit for hit in (future.result() for future in futures) if len(hit)]
+        return np.concatenate(hits) if hits else np.empty((0, 4))
+
+    def _chunks(self) -> list[tuple[int, int]]:
+        count = self.workers * self.chunks_per_worker
+        bounds = np.linspace(0, self.segment_count, count + 1).astype(int)
+        return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    def _run(self, job, shape: tuple, *args) -> np.ndarray:
+        """
+        Runs a job over every chunk, the job writes its part of a shared output array. The array is returned as is
+        rather than copied out, a tessellation can be as big as the memory, and keeps the shared memory alive.
+        """
+        output = SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+        try:
+            futures = [
+                self._pool.submit(job, start, stop, output.name, shape, *args)
+                for start, stop in self._chunks()
+            ]
+            for future in futures:
+                future.result()
+        except BaseException:
+            output.close()
+            output.unlink()
+            raise
+
+        # the workers are done with it so the name can go, the mapping stays until the result and its views are gone
+        output.unlink()
+        result = np.ndarray(shape, np.float64, output.buf)
+        weakref.finalize(result, output.close)
+        return result
+
+def _attach(name: str, shape: tuple):
+    global _segments, _segments_memory
+    _segments_memory = SharedMemory(name=name)
+    _segments = np.ndarray(shape, np.float64, _segments_memory.buf)
+
+def _output(name: str, shape: tuple) -> tuple[SharedMemory, np.ndarray]:
+    memory = SharedMemory(name=name)
+    return memory, np.ndarray(shape, np.float64, memory.buf)
+
+def _tessellate(start: int, stop: int, name: str, shape: tuple, resolution: int):
+    memory, out = _output(name, shape)
+    evaluate_bezier(_segments[start:stop], resolution, out=out[start:stop])
+    del out
+    memory.close()
+
+def _lengths(start: int, stop: int, name: str, shape: tuple, resolution: int):
+    memory, out = _output(name, shape)
+    points = evaluate_bezier(_segments[start:stop], resolution)
+    steps = np.diff(points, axis=1)
+    out[start:stop] = np.hypot(steps[..., 0], steps[..., 1]).sum(axis=1)
+    del out
+    memory.close()
+
+def _bounding_boxes(start: int, stop: int, name: str, shape: tuple):
+    memory, out = _output(name, shape)
+    out[start:stop] = cubic_bounding_boxes(_segments[start:stop])
+    del out
+    memory.close()
+
+def _intersect_line(start: int, stop: int, p: tuple, q: tuple, resolution: int, closed: bool) -> np.ndarray:
+    points = evaluate_bezier(_segments[start:stop], resolution) # (chunk, resolution + 1, 2)
+    p = np.asarray(p, dtype=np.float64)
+    r = np.asarray(q, dtype=np.float64) - p
+
+    # which side of the line every flattened point is on. Every edge owns the point it starts at but not the one
+    # it ends at, so it hits the line when it starts on it or when its ends are strictly on opposite sides. That way
+    # each point on the line is found once: a tangential touch is one hit, and so is a node, which ends a segment
+    # and starts the next one (both see the same side for it, they compute it from the same coordinates).
+    side = r[0] * (points[..., 1] - p[1]) - r[1] * (points[..., 0] - p[0])
+    before, after = side[:, :-1], side[:, 1:]
+    crossing = (before == 0) | ((before < 0) & (after > 0)) | ((before > 0) & (after < 0))
+
+    segment, edge = np.nonzero(crossing)
+    b, f = before[segment, edge], after[segment, edge]
+    u = np.divide(b, b - f, out=np.zeros_like(b), where=b != 0)
+
+    # no edge starts at the very end of an open spline, it's a point of its own. A closed spline's end is its start.
+    if not closed and stop == len(_segments) and side[-1, -1] == 0:
+        segment = np.append(segment, len(points) - 1)
+        edge = np.append(edge, resolution - 1)
+        u = np.append(u, 1.0)
+
+    a = points[segment, edge]
+    d = points[segment, edge + 1] - a
+    xy = a + u[:, None] * d
+
+    # keep the crossings between p and q
+    v = ((xy - p) @ r) / (r @ r)
+    inside = (v >= 0) & (v <= 1)
+    t = (edge + u) / resolution
+    return np.column_stack((segment + start, t, xy))[inside]
@@ -0,0 +1,100 @@
+"""
+A minimal PNG writer, 8 bit RGB only.
+
+Rows are compressed as they come in so an image can be written a band of rows at a time
+without ever holding all of it in memory.
+"""
+import struct
+import zlib
+
+import numpy as np
+
+_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_IDAT_SIZE = 1 << 16 # compressed bytes per IDAT chunk
+
+class PngWriter:
+    """
+    Streams an RGB image into a PNG file, top row first.
+    Use it as a context manager or call close() once all the rows are written.
+    """
+    def __init__(self, path: str, width: int, height: int, compression: int=6):
+        """
+        Args:
+            path (str): The file to write.
+            width (int): The image width in pixels.
+            height (int): The image height in pixels.
+            compression (int, optional): The zlib level, 0 to 9. Defaults to 6.
+        """
+        if width <= 0 or height <= 0:
+            raise ValueError("a PNG needs at least one pixel")
+
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+
+        self._file = open(path, "wb")
+        self._compressor = zlib.compressobj(compression)
+        self._pending = b""
+
+        self._file.write(_SIGNATURE)
+        # 8 bits per channel, color type 2 (RGB), default compression, filter and no interlacing
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def write_rows(self, rows: np.ndarray):
+        """
+        Appends rows to the image.
+
+        Args:
+            rows (np.ndarray): Shape (row_count, width, 3), uint8.
+        """
+        rows = np.asarray(rows, dtype=np.uint8)
+        if rows.ndim != 3 or rows.shape[1:] != (self.width, 3):
+            raise ValueError(f"expected rows of shape (n, {self.width}, 3), got {rows.shape}")
+        if self.rows_written + len(rows) > self.height:
+            raise ValueError("more rows than the image height")
+
+        # every row starts with its filter type, 0 (none)
+        filtered = np.zeros((len(rows), 1 + 3 * self.width), dtype=np.uint8)
+        filtered[:, 1:] = rows.reshape(len(rows), -1)
+
+        self._pending += self._compressor.compress(filtered.tobytes())
+        self._flush_pending(_IDAT_SIZE)
+        self.rows_written += len(rows)
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.rows_written != self.height:
+            self._file.close()
+            raise ValueError(f"only {self.rows_written} of {self.height} rows were written")
+
+        self._pending += self._compressor.flush()
+        self._flush_pending(1)
+        self._write_chunk(b"IEND", b"")
+        self._file.close()
+
+    def _flush_pending(self, minimum: int):
+        while len(self._pending) >= minimum:
+            self._write_chunk(b"IDAT", self._pending[:_IDAT_SIZE])
+            self._pending = self._pending[_IDAT_SIZE:]
+
+    def _write_chunk(self, kind: bytes, data: bytes):
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(kind)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+def write_png(path: str, pixels: np.ndarray, compression: int=6):
+    """Writes a (height, width, 3) uint8 image to a PNG file."""
+    height, width = pixels.shape[:2]
+    with PngWriter(path, width, height, compression) as writer:
+        writer.write_rows(pixels)
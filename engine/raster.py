@@ -0,0 +1,236 @@
+"""
+Software rasterization into a NumPy image, no OpenGL needed.
+
+Everything is anti-aliased with analytic coverage: the coverage of a pixel is the area of the shape
+inside the pixel's square, exactly for square points and along the distance to the shape for lines and
+round points. Shapes are drawn a tile of pixels at a time, each tile only looking at the shapes whose
+bounding boxes touch it, and all the pixels of a tile are computed together.
+"""
+import numpy as np
+
+from . import colors
+from .png import write_png
+
+ColorType = tuple[float, float, float] | tuple[float, float, float, float]
+
+class Raster:
+    """
+    An RGB image with float channels in [0, 1].
+
+    Shapes are given in canvas coordinates, the same ones the app uses with y going up, and the image shows the
+    canvas from `origin` (its bottom left corner) at `scale` image pixels per canvas unit, so the raster can show
+    any part of the canvas at any size. Image rows go down like in any image file.
+    Line widths and point sizes are in image pixels.
+    """
+    TILE_SIZE = 16
+    CHUNK_SIZE = 1 << 18 # the most (pixel, shape) pairs computed at once
+
+    def __init__(self, width: int, height: int, background: ColorType=colors.WHITE, origin=(0, 0), scale: float=1.0):
+        """
+        Args:
+            width (int): The image width in pixels.
+            height (int): The image height in pixels.
+            background (ColorType, optional): What the image is cleared to. Defaults to WHITE.
+            origin (tuple, optional): The canvas point at the bottom left corner of the image. Defaults to (0, 0).
+            scale (float, optional): Image pixels per canvas unit. Defaults to 1.
+        """
+        self.width = width
+        self.height = height
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.scale = float(scale)
+        self.pixels = np.empty((height, width, 3), dtype=np.float32)
+        self.clear(background)
+
+    def clear(self, color: ColorType=colors.WHITE):
+        self.pixels[:] = color[:3]
+
+    def to_pixels(self, points) -> np.ndarray:
+        """
+        Maps canvas points to image coordinates, pixel (i, j) covering [i, i + 1) x [j, j + 1).
+        y is flipped, the top of the image is `origin[1] + height / scale` on the canvas.
+        """
+        pixels = (np.asarray(points, dtype=np.float64) - self.origin) * self.scale
+        pixels[..., 1] = self.height - pixels[..., 1]
+        return pixels
+
+    def draw_lines(self, starts, ends, width: float=1, color: ColorType=colors.BLACK):
+        """
+        Draws line segments with round caps, the stroke being every point closer than width / 2 to one of
+        the segments. Overlapping segments don't darken each other, the stroke is drawn as one shape.
+
+        Args:
+            starts (array like): Shape (count, 2), where the segments start.
+            ends (array like): Shape (count, 2), where they end.
+            width (float, optional): The stroke width in pixels. Defaults to 1.
+            color (ColorType, optional): Defaults to BLACK.
+        """
+        a = self.to_pixels(starts).reshape(-1, 2)
+        b = self.to_pixels(ends).reshape(-1, 2)
+        if len(a) == 0:
+            return
+
+        d = b - a
+        length_squared = np.einsum("ij,ij->i", d, d)
+        inverse = np.divide(1, length_squared, out=np.zeros_like(length_squared), where=length_squared > 0)
+        half = width / 2
+
+        # the per pixel work is done in single precision, image coordinates don't need more
+        a32, d32, inverse = a.astype(np.float32), d.astype(np.float32), inverse.astype(np.float32)
+
+        def coverage(x, y, selected):
+            distance_squared = np.full(len(x), np.inf, dtype=np.float32)
+            for chunk in self._chunks(selected, len(x)):
+                rx = x[:, None] - a32[chunk, 0]
+                ry = y[:, None] - a32[chunk, 1]
+                t = (rx * d32[chunk, 0] + ry * d32[chunk, 1]) * inverse[chunk]
+                _clamp(t)
+                ex = rx - t * d32[chunk, 0]
+                ey = ry - t * d32[chunk, 1]
+                np.minimum(distance_squared, (ex * ex + ey * ey).min(axis=1), out=distance_squared)
+            return _band_coverage(np.sqrt(distance_squared), half)
+
+        margin = half + 1
+        self._composite(np.minimum(a, b) - margin, np.maximum(a, b) + margin, coverage, color)
+
+    def draw_polylines(self, strips, width: float=1, color: ColorType=colors.BLACK):
+        """Draws (count, length, 2) or (length, 2) arrays of points as connected lines, see draw_lines."""
+        strips = np.asarray(strips, dtype=np.float64)
+        if strips.ndim == 2:
+            strips = strips[None]
+        self.draw_lines(strips[:, :-1].reshape(-1, 2), strips[:, 1:].reshape(-1, 2), width, color)
+
+    def draw_points(self, points, size: float=1, color: ColorType=colors.BLACK, round: bool=False):
+        """
+        Draws points as squares, or circles if round, `size` pixels across. Like GL points, their size doesn't scale.
+
+        Args:
+            points (array like): Shape (count, 2).
+            size (float, optional): The side or the diameter in pixels. Defaults to 1.
+            color (ColorType, optional): Defaults to BLACK.
+            round (bool, optional): Defaults to False.
+        """
+        centers = self.to_pixels(points).reshape(-1, 2)
+        if len(centers) == 0:
+            return
+        half = size / 2
+
+        def coverage(x, y, selected):
+            covered = np.zeros(len(x))
+            for chunk in self._chunks(selected, len(x)):
+                dx = x[:, None] - centers[chunk, 0]
+                dy = y[:, None] - centers[chunk, 1]
+                if round:
+                    c = _clamp(half + 0.5 - np.hypot(dx, dy))
+                else:
+                    c = _band_coverage(np.abs(dx), half) * _band_coverage(np.abs(dy), half)
+                np.maximum(covered, c.max(axis=1), out=covered)
+            return covered
+
+        margin = half + 1
+        self._composite(centers - margin, centers + margin, coverage, color)
+
+    def draw_triangles(self, triangles, color: ColorType=colors.BLACK):
+        """
+        Fills the shape made of triangles, e.g. a triangulated polygon. Edges shared by two triangles are inside
+        the shape and don't show, only the outline (the edges of a single triangle) is anti-aliased.
+
+        Args:
+            triangles (array like): Shape (count, 3, 2) or (count * 3, 2), three consecutive points per triangle.
+            color (ColorType, optional): Defaults to BLACK.
+        """
+        triangles = np.asarray(triangles, dtype=np.float64).reshape(-1, 3, 2)
+        if len(triangles) == 0:
+            return
+
+        # an edge is on the outline if no other triangle has it
+        edges = np.stack((triangles, np.roll(triangles, -1, axis=1)), axis=2) # (count, 3 edges, 2 ends, 2)
+        keys = np.sort(edges.view(np.complex128)[..., 0], axis=2).reshape(-1, 2) # ends in the same order both ways
+        _, inverse, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+        outline = (counts[inverse.ravel()] == 1).reshape(-1, 3)
+
+        corners = self.to_pixels(triangles).astype(np.float32)
+        a = corners
+        d = np.roll(corners, -1, axis=1) - corners # (count, 3, 2), the edge vectors
+        length_squared = np.einsum("kij,kij->ki", d, d)
+        inverse_length = np.divide(1, length_squared, out=np.zeros_like(length_squared), where=length_squared > 0)
+
+        def coverage(x, y, selected):
+            inside = np.zeros(len(x), dtype=bool)
+            distance_squared = np.full(len(x), np.inf, dtype=np.float32)
+            for chunk in self._chunks(selected, 3 * len(x)):
+                rx = x[:, None, None] - a[chunk, :, 0] # (pixels, triangles, 3 edges)
+                ry = y[:, None, None] - a[chunk, :, 1]
+                cross = d[chunk, :, 0] * ry - d[chunk, :, 1] * rx
+                inside |= ((cross >= 0).all(axis=2) | (cross <= 0).all(axis=2)).any(axis=1)
+
+                t = (rx * d[chunk, :, 0] + ry * d[chunk, :, 1]) * inverse_length[chunk]
+                _clamp(t)
+                ex = rx - t * d[chunk, :, 0]
+                ey = ry - t * d[chunk, :, 1]
+                squared = np.where(outline[chunk], ex * ex + ey * ey, np.inf)
+                np.minimum(distance_squared, squared.min(axis=(1, 2)), out=distance_squared)
+
+            # the coverage of a pixel cut by a straight edge, half of it at the edge itself
+            distance = np.sqrt(distance_squared)
+            return _clamp(np.where(inside, 0.5 + distance, 0.5 - distance))
+
+        self._composite(corners.min(axis=1) - 1, corners.max(axis=1) + 1, coverage, color)
+
+    def to_uint8(self) -> np.ndarray:
+        return (np.clip(self.pixels, 0, 1) * 255 + 0.5).astype(np.uint8)
+
+    def write_png(self, path: str):
+        write_png(path, self.to_uint8())
+
+    def _chunks(self, selected: np.ndarray, pixel_count: int):
+        step = max(self.CHUNK_SIZE // max(pixel_count, 1), 1)
+        for i in range(0, len(selected), step):
+            yield selected[i:i + step]
+
+    def _composite(self, low: np.ndarray, high: np.ndarray, coverage, color: ColorType):
+        """
+        Blends a shape into the image one tile at a time.
+
+        Args:
+            low, high (np.ndarray): Shape (count, 2), the pixel space bounding boxes of the shape's parts.
+            coverage (Callable): coverage(x, y, selected) returns the coverage of the pixel centers (x, y) by the
+                parts whose indices are in selected.
+            color (ColorType): The color of the shape.
+        """
+        tile = self.TILE_SIZE
+        color = np.asarray(color[:3], dtype=np.float32)
+        tile_columns = -(-self.width // tile)
+        grid_y, grid_x = np.mgrid[0:tile, 0:tile].astype(np.float32) + 0.5 # the pixel centers of a tile
+
+        for y0 in range(0, self.height, tile):
+            y1 = min(y0 + tile, self.height)
+            in_row = np.flatnonzero((high[:, 1] >= y0) & (low[:, 1] <= y1) & (high[:, 0] >= 0) & (low[:, 0] <= self.width))
+            if len(in_row) == 0:
+                continue
+
+            # only visit the tiles of the row that some part reaches into
+            first = np.clip(low[in_row, 0] // tile, 0, tile_columns - 1).astype(np.intp)
+            last = np.clip(high[in_row, 0] // tile, 0, tile_columns - 1).astype(np.intp)
+            low_x, high_x = low[in_row, 0], high[in_row, 0]
+            reached = np.zeros(tile_columns + 1, dtype=np.intp)
+            np.add.at(reached, first, 1)
+            np.add.at(reached, last + 1, -1)
+
+            for column in np.flatnonzero(np.cumsum(reached[:-1])):
+                x0 = column * tile
+                x1 = min(x0 + tile, self.width)
+                selected = in_row[(high_x >= x0) & (low_x <= x1)]
+
+                xs = (grid_x[:y1 - y0, :x1 - x0] + x0).ravel()
+                ys = (grid_y[:y1 - y0, :x1 - x0] + y0).ravel()
+                c = coverage(xs, ys, selected).astype(np.float32).reshape(y1 - y0, x1 - x0, 1)
+                pixels = self.pixels[y0:y1, x0:x1]
+                pixels += c * (color - pixels)
+
+def _band_coverage(distance: np.ndarray, half_width: float) -> np.ndarray:
+    """How much of a pixel, distance away from the middle of a band half_width wide on each side, the band covers."""
+    return _clamp(np.minimum(distance + 0.5, half_width) - np.maximum(distance - 0.5, -half_width))
+
+def _clamp(values: np.ndarray) -> np.ndarray:
+    # clamps to [0, 1] in place, np.clip has a lot of overhead for the small arrays of a tile
+    return np.minimum(np.maximum(values, 0, out=values), 1, out=values)
@@ -0,0 +1,77 @@
+"""
+Compact binary recordings of the input event stream.
+
+A recording is a small header followed by one fixed size record per event:
+the event type, the time since the recording started and up to 3 arguments.
+Frame boundaries are recorded too so a replay hands the events to the app in the exact same batches.
+"""
+import struct
+from dataclasses import dataclass
+from time import perf_counter
+
+_MAGIC = b"BZIN\x01"
+_RECORD = struct.Struct("<Bdddi") # type, time, a, b, c
+
+# event name -> event type stored in the file
+EVENT_CODES = {
+    "left_click": 1,
+    "left_release": 2,
+    "mouse_move": 3,
+    "key_press": 4,
+    "key_release": 5,
+    "frame": 6
+}
+_EVENT_NAMES = {code: name for name, code in EVENT_CODES.items()}
+_KEY_EVENTS = ("key_press", "key_release")
+
+@dataclass(frozen=True)
+class InputEvent:
+    time: float # seconds since the recording started
+    name: str
+    args: tuple
+
+class InputRecorder:
+    """Writes events to a recording file as they happen."""
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        self._file.write(_MAGIC)
+        self._started_at = perf_counter()
+
+    def write(self, name: str, args: tuple):
+        code = EVENT_CODES.get(name)
+        if code is None:
+            return # not an event we know how to replay
+
+        t = perf_counter() - self._started_at
+        if name in _KEY_EVENTS:
+            key, scancode, mods = args
+            record = _RECORD.pack(code, t, key, scancode, mods)
+        elif name == "frame":
+            record = _RECORD.pack(code, t, 0, 0, 0)
+        else:
+            x, y = args
+            record = _RECORD.pack(code, t, x, y, 0)
+        self._file.write(record)
+
+    def close(self):
+        self._file.close()
+
+def read_recording(path) -> list[InputEvent]:
+    """Reads a recording written by InputRecorder."""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if not data.startswith(_MAGIC):
+        raise ValueError(f"{path} is not an input recording")
+
+    events = []
+    for code, t, a, b, c in _RECORD.iter_unpack(data[len(_MAGIC):]):
+        name = _EVENT_NAMES[code]
+        if name in _KEY_EVENTS:
+            args = (int(a), int(b), c)
+        elif name == "frame":
+            args = ()
+        else:
+            args = (a, b)
+        events.append(InputEvent(t, name, args))
+    return events
@@ -1,19 +1,36 @@
 from typing import Iterable, Union
 
+import numpy as np
 from OpenGL.GL import *
 
 from . import colors
+from .buffer import PointBuffer
+from .curves import evaluate_bezier, tessellate_bezier_chain
 from .point import Point
 
 PointType = Union[Point, set]
 ColorType = set[float]
 
+# GL component type for each dtype a PointBuffer can hold
+_GL_TYPES = {
+    np.dtype(np.float32): GL_FLOAT,
+    np.dtype(np.float64): GL_DOUBLE,
+}
+
 class Renderer:
     def __init__(self, clear_color=colors.WHITE):
         self.clear_color = clear_color
         self._default_point_size = 1
         self._default_line_width = 1
 
+        # scratch buffer the curves get tessellated into, reused every frame
+        self._curve_buffer = PointBuffer(1024)
+
+        # first index and length of every strip for glMultiDrawArrays, rebuilt only when the layout changes
+        self._strip_layout = (0, 0)
+        self._strip_firsts = np.zeros(0, dtype=np.int32)
+        self._strip_counts = np.zeros(0, dtype=np.int32)
+
     @property
     def default_point_size(self):
         return self._default_point_size
@@ -101,11 +118,32 @@ class Renderer:
         """
         assert len(points) == 4, f"must provide exactly 4 points, received {len(points)}"
 
-        # generate the points
-        points = _get_cubic_bezier_points(points)
+        self.draw_bezier(points, do_smooth=do_smooth, do_alpha_blend=do_alpha_blend, line_width=line_width, line_color=line_color)
 
-        # draw the polyline
-        self.draw_polyline(points, do_smooth, do_alpha_blend, line_width, line_color)
+    def draw_bezier(
+            self,
+            points: Iterable[Point] | Iterable[set],
+            num_segments: int=200,
+            do_smooth: bool=True,
+            do_alpha_blend: bool=True,
+            line_width: int=None,
+            line_color: set[float]=colors.BLACK
+    ):
+        """
+        Draws a bezier curve of any degree to the window. The degree is the number of points minus 1.
+
+        Args:
+            points (Iterable[Point] | Iterable[set[int]]): The control points.
+            num_segments (int, optional): How many line segments the curve is drawn with. Defaults to 200.
+            do_smooth, do_alpha_blend, line_width, line_color: see draw_polyline.
+        """
+        control_points = np.array([(p[0], p[1]) for p in points], dtype=np.float32)
+
+        self._curve_buffer.reserve(num_segments + 1)
+        self._curve_buffer.count = num_segments + 1
+        evaluate_bezier(control_points, num_segments, out=self._curve_buffer.data[:num_segments + 1])
+
+        self.draw_line_strips(self._curve_buffer, num_segments + 1, do_smooth, do_alpha_blend, line_width, line_color)
 
     def draw_polyline(
             self, 
@@ -182,47 +220,150 @@ class Renderer:
 
         glDisable(GL_LINE_STIPPLE)
 
-def _get_cubic_bezier_points(
-            points: Iterable[Point] | Iterable[set], 
+    def draw_point_buffer(
+            self,
+            buffer: PointBuffer,
+            round: bool=False,
+            color: ColorType=colors.BLACK
+        ):
+        """
+        Draws the points of a PointBuffer straight from its array, without building any per point objects.
+
+        Args:
+            buffer (PointBuffer): The points to be drawn.
+            round (bool): Should the points be rouded? Defaults to False.
+            color (ColorType, optional): The color of all the points. Defaults to BLACK.
+        """
+        if buffer.count == 0:
+            return
+
+        if round:
+            glEnable(GL_POINT_SMOOTH)
+            glEnable(GL_BLEND)
+            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+        glColor3f(*color[:3])
+        self._draw_arrays(GL_POINTS, buffer)
+
+        if round:
+            glDisable(GL_POINT_SMOOTH)
+            glDisable(GL_BLEND)
+
+    def draw_triangle_buffer(self, buffer: PointBuffer, color: ColorType=colors.BLACK):
+        """
+        Fills the triangles of a PointBuffer, every 3 consecutive points form a triangle.
+
+        Args:
+            buffer (PointBuffer): The triangles' corners.
+            color (ColorType, optional): The fill color. Defaults to BLACK.
+        """
+        if buffer.count < 3:
+            return
+
+        glColor3f(*color[:3])
+        self._draw_arrays(GL_TRIANGLES, buffer)
+
+    def draw_dotted_line_buffer(
+            self,
+            buffer: PointBuffer,
+            color: ColorType=colors.BLACK,
+            scale_factor: float = 1,
+            stippled_pattern: int = 0b1010101010101010
+        ):
+        """
+        Same as draw_dotted_lines but reads the points from a PointBuffer. Pairs of points form a line.
+        """
+        if buffer.count == 0:
+            return
+
+        glColor3f(*color[:3])
+
+        glEnable(GL_LINE_STIPPLE)
+        glLineStipple(scale_factor, stippled_pattern)
+        self._draw_arrays(GL_LINES, buffer)
+        glDisable(GL_LINE_STIPPLE)
+
+    def draw_cubic_bezier_buffer(
+            self,
+            buffer: PointBuffer,
             num_segments: int=200,
-            return_type: type=Point
-            ) -> list[Point] | list[set]:
+            do_smooth: bool=True,
+            do_alpha_blend: bool=True,
+            line_width: int=None,
+            line_color: ColorType=colors.BLACK
+        ):
         """
-        Helper func that generates a number of points along a bezier curve given the control points.
+        Draws a chain of cubic beziers whose control points are stored in a PointBuffer.
+        Consecutive curves share their end point i.e., the buffer holds p0, p1, p2, p3, p4, p5, p6...
+        The curves are tessellated into a scratch buffer owned by the renderer so nothing is allocated per frame.
 
         Args:
-            points (Iterable[Point] | Iterable[set]): The control points. Length must be 4.
-            num_segments (int, optional): How many output points. Defaults to 200.
-            return_type (type, optional): Should the function return Points or coordinates in sets. Defaults to Point.
+            buffer (PointBuffer): The control points of the chain.
+            num_segments (int, optional): How many line segments per curve. Defaults to 200.
+            do_smooth, do_alpha_blend, line_width, line_color: see draw_polyline.
+        """
+        if buffer.count < 4:
+            return
 
-        Raises:
-            ValueError: if return_type is neither Point nor set.
+        tessellate_bezier_chain(buffer, self._curve_buffer, 3, num_segments)
+        self.draw_line_strips(self._curve_buffer, num_segments + 1, do_smooth, do_alpha_blend, line_width, line_color)
 
-        Returns:
-            list[Point] | list[set[int]]: The list of points along the bezier curve.
+    def draw_line_strips(
+            self,
+            buffer: PointBuffer,
+            strip_length: int,
+            do_smooth: bool=True,
+            do_alpha_blend: bool=True,
+            line_width: int=None,
+            line_color: ColorType=colors.BLACK
+        ):
         """
-        assert len(points) == 4, "num of control points must be 4 for cubic bezier"
+        Draws the points of a PointBuffer as consecutive polylines of `strip_length` points each.
+        See draw_polyline for the other arguments.
+        """
+        if buffer.count < strip_length:
+            return
 
-        p0, p1, p2, p3 = points
-        
-        def bez(t, a, b, c, d):
-            return (1 - t) ** 3 * a + 3 * (1 - t) ** 2 * t * b + 3 * (1 - t) * t ** 2 * c + t ** 3 * d
-        
-        # generate the points first
-        curve_points = []
-        if return_type is Point:
-            for i in range(num_segments + 1):
-                t = i / num_segments
-                x = bez(t, p0[0], p1[0], p2[0], p3[0])
-                y = bez(t, p0[1], p1[1], p2[1], p3[1])
-                curve_points.append(Point(x, y))
-        elif return_type is set:
-            for i in range(num_segments + 1):
-                t = i / num_segments
-                x = bez(t, p0[0], p1[0], p2[0], p3[0])
-                y = bez(t, p0[1], p1[1], p2[1], p3[1])
-                curve_points.append((x, y))
-        else:
-            raise ValueError("param return_type must be Point or set")
-        
-        return curve_points
+        if do_smooth:
+            glEnable(GL_LINE_SMOOTH)
+        if do_alpha_blend:
+            glEnable(GL_BLEND)
+            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+        # set line width if given
+        if line_width:
+            glLineWidth(line_width)
+
+        glColor3f(*line_color[:3])
+
+        strip_count = buffer.count // strip_length
+        if self._strip_layout != (strip_count, strip_length):
+            self._strip_firsts = np.arange(0, strip_count * strip_length, strip_length, dtype=np.int32)
+            self._strip_counts = np.full(strip_count, strip_length, dtype=np.int32)
+            self._strip_layout = (strip_count, strip_length)
+
+        # all the strips in a single call instead of one glDrawArrays per strip
+        glEnableClientState(GL_VERTEX_ARRAY)
+        self._vertex_pointer(buffer)
+        glMultiDrawArrays(GL_LINE_STRIP, self._strip_firsts, self._strip_counts, strip_count)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+        # reset the line width to the default one
+        glLineWidth(self.default_line_width)
+
+    def _draw_arrays(self, mode, buffer: PointBuffer):
+        """Draws the valid points of a buffer with a client side vertex array."""
+        glEnableClientState(GL_VERTEX_ARRAY)
+        self._vertex_pointer(buffer)
+        glDrawArrays(mode, 0, buffer.count)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    @staticmethod
+    def _vertex_pointer(buffer: PointBuffer):
+        """Points the vertex array at a buffer's data, with the GL type matching its dtype."""
+        data = buffer.data
+        gl_type = _GL_TYPES.get(data.dtype)
+        if gl_type is None:
+            raise TypeError(f"Can't draw a PointBuffer of {data.dtype}, use float32 or float64.")
+
+        glVertexPointer(2, gl_type, 0, data)
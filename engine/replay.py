@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING
+
+from .recording import InputEvent, read_recording
+
+if TYPE_CHECKING:
+    from .app import App # only for the annotations, replays can be driven without a window system
+
+@dataclass
+class ReplayResult:
+    frame_times: list[float] # seconds spent on each frame, input handling included
+    final_state: object = None # what App.state() returned after the last event
+
+    def over_budget(self, budget: float) -> list[int]:
+        """The indices of the frames that took longer than budget seconds."""
+        return [i for i, t in enumerate(self.frame_times) if t > budget]
+
+    def within_budget(self, budget: float, p: float=100) -> bool:
+        """Did p percent of the frames (all of them by default) take at most budget seconds?"""
+        return self.percentile(p) <= budget
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.frame_times)
+
+    @property
+    def max_frame_time(self) -> float:
+        return max(self.frame_times, default=0.0)
+
+    @property
+    def mean_frame_time(self) -> float:
+        return sum(self.frame_times) / len(self.frame_times) if self.frame_times else 0.0
+
+    def percentile(self, p: float) -> float:
+        """The frame time that p percent of the frames stayed under, p in [0, 100]."""
+        if not self.frame_times:
+            return 0.0
+        ordered = sorted(self.frame_times)
+        return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+def replay(app: App, recording: str | list[InputEvent], realtime: bool=False) -> ReplayResult:
+    """
+    Feeds a recorded event stream back into an app and renders a frame at every recorded frame boundary,
+    so the app sees the exact same events in the exact same frames as when it was recorded.
+    Live input from the window is ignored while replaying.
+
+    Args:
+        app (App): The app to drive. Use visible=False for a headless replay.
+        recording (str | list[InputEvent]): A recording file or events read with read_recording.
+        realtime (bool, optional): Wait between events like the original session did instead of
+            going as fast as possible. Defaults to False.
+
+    Returns:
+        ReplayResult: The time taken by every replayed frame and the app's state at the end.
+    """
+    events = read_recording(recording) if isinstance(recording, str) else recording
+    input_manager = app.input_manager
+
+    frame_times = []
+    started_at = frame_started_at = perf_counter()
+    for event in events:
+        if realtime:
+            delay = event.time - (perf_counter() - started_at)
+            if delay > 0:
+                sleep(delay)
+
+        if event.name == "frame":
+            app.render_frame()
+            now = perf_counter()
+            frame_times.append(now - frame_started_at)
+            frame_started_at = now
+        else:
+            input_manager.dispatch(event.name, *event.args)
+
+    return ReplayResult(frame_times, app.state())
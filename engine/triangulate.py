@@ -0,0 +1,141 @@
+"""Polygon triangulation by ear clipping."""
+import numpy as np
+
+def signed_area(points) -> float:
+    """Positive for counter clockwise polygons."""
+    points = np.asarray(points, dtype=np.float64)
+    x, y = points[:, 0], points[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+def triangulate_polygon(points) -> np.ndarray:
+    """
+    Triangulates a simple polygon with ear clipping.
+
+    Only reflex vertices can block an ear, they're kept in a uniform grid so every ear test only looks at the
+    few of them near the ear instead of all of them. Self intersecting outlines don't have a proper
+    triangulation, when no ear is left the current vertex is clipped anyway so the result still covers the
+    outline reasonably.
+
+    Args:
+        points (array like): The (n, 2) vertices of the polygon in order, either orientation, not repeating the first one.
+
+    Returns:
+        np.ndarray: (n - 2, 3) vertex indices of the triangles, counter clockwise.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n = len(points)
+    if n < 3:
+        return np.empty((0, 3), dtype=np.intp)
+
+    order = np.arange(n) if signed_area(points) >= 0 else np.arange(n)[::-1]
+    pts = points[order]
+    previous = list(range(-1, n - 1))
+    previous[0] = n - 1
+    next = list(range(1, n + 1))
+    next[-1] = 0
+
+    # plain floats, the loop below does scalar math on a few vertices at a time
+    x, y = pts[:, 0].tolist(), pts[:, 1].tolist()
+    reflex = [_cross(x, y, previous[i], i, next[i]) <= 0 for i in range(n)]
+    grid = _ReflexGrid(x, y, [i for i in range(n) if reflex[i]])
+
+    triangles = []
+    remaining = n
+    i = 0
+    misses = 0
+    while remaining > 3:
+        p, c, q = previous[i], i, next[i]
+        is_ear = not reflex[c] and not grid.blocks(p, c, q)
+
+        # no ear anywhere, the outline isn't simple, clip this vertex anyway
+        if not is_ear and misses > remaining:
+            is_ear = True
+
+        if not is_ear:
+            misses += 1
+            i = q
+            continue
+
+        triangles.append((p, c, q))
+        if reflex[c]:
+            grid.remove(c)
+        next[p], previous[q] = q, p
+        remaining -= 1
+        misses = 0
+
+        # the neighbours' angles changed
+        for v in (p, q):
+            was_reflex = reflex[v]
+            reflex[v] = _cross(x, y, previous[v], v, next[v]) <= 0
+            if was_reflex and not reflex[v]:
+                grid.remove(v)
+            elif reflex[v] and not was_reflex:
+                grid.add(v)
+        i = q
+
+    triangles.append((previous[i], i, next[i]))
+    return order[np.array(triangles, dtype=np.intp)]
+
+def _cross(x, y, a, b, c) -> float:
+    """z of (b - a) x (c - b), positive when a -> b -> c turns left."""
+    return (x[b] - x[a]) * (y[c] - y[b]) - (y[b] - y[a]) * (x[c] - x[b])
+
+class _ReflexGrid:
+    """The current reflex vertices, bucketed in a uniform grid of about one cell per vertex of the polygon."""
+    def __init__(self, x: list[float], y: list[float], reflex: list[int]):
+        self.x, self.y = x, y
+        self.x0, self.y0 = min(x), min(y)
+        self.side = max(int(len(x) ** 0.5), 1) # cells per side
+        extent = max(max(x) - self.x0, max(y) - self.y0)
+        self.inverse = self.side / extent if extent > 0 else 0.0
+        self.buckets: dict[tuple[int, int], set[int]] = {}
+        self.count = 0
+        for v in reflex:
+            self.add(v)
+
+    def _cell(self, px: float, py: float) -> tuple[int, int]:
+        last = self.side - 1
+        return min(int((px - self.x0) * self.inverse), last), min(int((py - self.y0) * self.inverse), last)
+
+    def add(self, v: int):
+        self.buckets.setdefault(self._cell(self.x[v], self.y[v]), set()).add(v)
+        self.count += 1
+
+    def remove(self, v: int):
+        cell = self._cell(self.x[v], self.y[v])
+        bucket = self.buckets[cell]
+        bucket.discard(v)
+        if not bucket:
+            del self.buckets[cell]
+        self.count -= 1
+
+    def blocks(self, a: int, b: int, c: int) -> bool:
+        """Is any reflex vertex inside or on the triangle abc (counter clockwise)?"""
+        if self.count == 0:
+            return False
+
+        x, y = self.x, self.y
+        ax, ay, bx, by, cx, cy = x[a], y[a], x[b], y[b], x[c], y[c]
+        i0, j0 = self._cell(min(ax, bx, cx), min(ay, by, cy))
+        i1, j1 = self._cell(max(ax, bx, cx), max(ay, by, cy))
+
+        # visit the cells under the triangle, or every bucket if there are fewer of those
+        if (i1 - i0 + 1) * (j1 - j0 + 1) <= len(self.buckets):
+            buckets = [self.buckets.get((i, j)) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+        else:
+            buckets = self.buckets.values()
+
+        for bucket in buckets:
+            if not bucket:
+                continue
+            for v in bucket:
+                if v == a or v == b or v == c:
+                    continue
+                px, py = x[v], y[v]
+                if ((bx - ax) * (py - ay) - (by - ay) * (px - ax) >= 0 and
+                        (cx - bx) * (py - by) - (cy - by) * (px - bx) >= 0 and
+                        (ax - cx) * (py - cy) - (ay - cy) * (px - cx) >= 0):
+                    # vertices sitting on top of a corner don't block it
+                    if (px, py) not in ((ax, ay), (bx, by), (cx, cy)):
+                        return True
+        return False
@@ -2,7 +2,7 @@ import glfw
 from OpenGL.GL import *
 
 class Window:
-    def __init__(self, width: int=800, height: int=600, title: str="Unnamed Window", multisample_rate: int=None):
+    def __init__(self, width: int=800, height: int=600, title: str="Unnamed Window", multisample_rate: int=None, visible: bool=True):
         self.DO_MULTISAMPLE = multisample_rate is not None
 
         # initialize glfw if not already
@@ -17,6 +17,9 @@ class Window:
         if self.DO_MULTISAMPLE:
             glfw.window_hint(glfw.SAMPLES, multisample_rate)
 
+        # hidden windows still get a context and a framebuffer, used for headless replays
+        glfw.window_hint(glfw.VISIBLE, visible)
+
         # create window
         self.window = glfw.create_window(width, height, title, None, None)
         if not self.window:
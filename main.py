@@ -1,12 +1,98 @@
-import sys
+from time import perf_counter
+STARTED_AT = perf_counter()
+
+import argparse
+import json
+import time
 from src.app import BezierApp
+IMPORTED_AT = perf_counter()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bezier Curve Editor")
+    parser.add_argument("window_width", type=int)
+    parser.add_argument("window_height", type=int)
+    parser.add_argument("--background-tessellation", action="store_true", help="tessellate large splines on a background thread")
+    parser.add_argument("--startup-time", action="store_true", help="print the startup milestones on exit")
+    parser.add_argument("--startup-log", metavar="PATH", help="append the startup milestones to a file, one JSON line per run")
+    parser.add_argument("--record", metavar="PATH", help="record the input events to a file, starting from an empty document")
+    parser.add_argument("--replay", metavar="PATH", help="replay recorded input events and print the frame times")
+    parser.add_argument("--realtime", action="store_true", help="replay at the recorded speed instead of as fast as possible")
+    parser.add_argument("--frame-budget", metavar="MS", type=float, help="fail the replay if a frame takes longer than this")
+    parser.add_argument("--headless", action="store_true", help="replay in a hidden window")
+    parser.add_argument("--autosave", metavar="DIR", default=".autosave", help="where the edit journal is kept (default: .autosave)")
+    parser.add_argument("--no-autosave", action="store_true", help="don't journal edits or recover the last session")
+    parser.add_argument("--restore-before-reset", action="store_true", help="recover the document as it was before the last reset")
+    return parser.parse_args()
+
+def startup_milestones(app: BezierApp) -> dict[str, float | None]:
+    """How long it took to get to each startup milestone, in ms since main.py started running. None if not reached."""
+    def ms(t):
+        return round((t - STARTED_AT) * 1000, 1) if t is not None else None
+
+    return {"imports": ms(IMPORTED_AT), "window": ms(app.created_at), "first_frame": ms(app.first_frame_at)}
+
+def report_startup_time(app: BezierApp):
+    def ms(t):
+        return f"{t:.1f} ms" if t is not None else "n/a"
+
+    milestones = startup_milestones(app)
+    print(f"Startup: imports {ms(milestones['imports'])}, window {ms(milestones['window'])}, first frame {ms(milestones['first_frame'])}")
 
-WINDOW_WIDTH = int(sys.argv[1])
-WINDOW_HEIGHT = int(sys.argv[2])
+def log_startup_time(app: BezierApp, path: str):
+    """Appends the startup milestones to a file so runs can be compared over time."""
+    entry = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), **startup_milestones(app)}
+    with open(path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+def replay(app: BezierApp, path: str, realtime: bool, frame_budget: float | None) -> bool:
+    """Replays a recording and prints the frame times. Returns False if a frame went over the budget in ms."""
+    from engine.replay import replay
+
+    result = replay(app, path, realtime)
+    print(
+        f"Replayed {result.frame_count} frames: "
+        f"mean {result.mean_frame_time * 1000:.2f} ms, "
+        f"p99 {result.percentile(99) * 1000:.2f} ms, "
+        f"max {result.max_frame_time * 1000:.2f} ms, "
+        f"{len(result.final_state.rows)} nodes"
+    )
+    app.on_close()
+    app.window.terminate()
+
+    if frame_budget is None:
+        return True
+    slow = result.over_budget(frame_budget / 1000)
+    if slow:
+        print(f"{len(slow)} frames over the {frame_budget:g} ms budget, the first one is frame {slow[0]}")
+    return not slow
 
 def main():
-    app = BezierApp(WINDOW_WIDTH, WINDOW_HEIGHT, "Bezier Curve Editor")
+    args = parse_args()
+    app = BezierApp(
+        args.window_width,
+        args.window_height,
+        "Bezier Curve Editor",
+        background_tessellation=args.background_tessellation,
+        visible=not (args.replay and args.headless),
+        # recordings and replays both start from an empty document, a recording made on top of a recovered
+        # session would replay differently, so neither touches the autosave
+        journal_dir=None if args.no_autosave or args.replay or args.record else args.autosave,
+        restore_before_reset=args.restore_before_reset
+    )
+
+    if args.replay:
+        if not replay(app, args.replay, args.realtime, args.frame_budget):
+            raise SystemExit(1)
+        return
+
+    if args.record:
+        app.input_manager.start_recording(args.record)
     app()
+
+    if args.startup_time:
+        report_startup_time(app)
+    if args.startup_log:
+        log_startup_time(app, args.startup_log)
     
 if __name__ == "__main__":
     main()
@@ -1,26 +1,79 @@
+from math import atan2, hypot
 from typing import override
 
 import glfw
 from OpenGL.GL import *
 
-from engine import App
+from engine import App, colors
 
+from .control_point import ControlPoint
+from .fill import FillCache
+from .frame import FrameBuffers
+from .journal import Document, EditJournal, document_from_spline
 from .node import Node
+from .selection import Selection
+from .smooth import auto_smooth, auto_smooth_around
 from .spline import Spline
+from .tessellation import TessellationWorker
 
 class BezierApp(App):
-    def __init__(self, width, height, window_name):
-        super().__init__(width, height, window_name, 4)
+    # splines with fewer curves than this are tessellated on the render thread even when the
+    # background worker is on, it's faster than waiting a frame for the worker
+    BACKGROUND_TESSELLATION_THRESHOLD = 256
+
+    def __init__(self, width, height, window_name, background_tessellation=False, visible=True, journal_dir=None, restore_before_reset=False):
+        super().__init__(width, height, window_name, 4, visible)
         self.tolerance = 2 # how many times the size of a point should the area that counts as a valid click be?
         self._dragging = False
         self._dragged_node = None
+        self._dragged_index = None # where the dragged point sits in the spline, for the journal
+        self._geometry_dirty = True # has the spline changed since it was last handed to the worker?
+        self._first_snapshot = None # the first snapshot handed to the worker since the spline got big enough for it
+        self._held_keys = set()
+        self._cursor = (0, 0)
+
+        # while auto-smoothing is on the control points are solved for a C2 curve, re-solving near edited nodes
+        self.auto_smoothing = False
+        self._smoothed_nodes = [] # nodes re-solved by the current drag, for the journal
+
+        # multi selection, shift + drag draws a selection box and dragging a selected point transforms the
+        # whole selection (translate by default, scale while S is held and rotate while R is held)
+        self.selection: Selection | None = None
+        self._box_start = None
+        self._box_end = None
+        self._gesture_anchor = None
+        self._gesture_origin = None
+        self._gesture_rows = None # where the selection is in the frame buffers while it's being transformed
+
+        # optionally tessellate big splines on a background thread
+        self.tessellation_worker = TessellationWorker() if background_tessellation else None
 
-        # initialize the spline
-        self.spline = Spline()
+        # initialize the spline, recovering it from the autosave journal if there is one
+        self.journal = EditJournal(journal_dir, before_reset=restore_before_reset) if journal_dir else None
+        self.spline = self.journal.recovered if self.journal else Spline()
+
+        # buffers the spline gets written into every frame
+        self.frame = FrameBuffers()
+        self.fill = FillCache(background=True)
 
         # reset the app when the user presses e
         self.input_manager.register_callback("key_press", self.reset, key_filter=glfw.KEY_E)
 
+        # open and close the path when the user presses c
+        self.input_manager.register_callback("key_press", self.toggle_closed, key_filter=glfw.KEY_C)
+
+        # toggle auto-smoothing when the user presses a
+        self.input_manager.register_callback("key_press", self.toggle_auto_smoothing, key_filter=glfw.KEY_A)
+
+        # insert a node on the curve under the cursor when the user presses i, delete the node under it with delete
+        self.input_manager.register_callback("key_press", self.insert_node, key_filter=glfw.KEY_I)
+        self.input_manager.register_callback("key_press", self.delete_node, key_filter=glfw.KEY_DELETE)
+        self.input_manager.register_callback("key_press", self.delete_node, key_filter=glfw.KEY_BACKSPACE)
+
+        # keep track of the held keys for the selection modifiers
+        self.input_manager.register_callback("key_press", self.on_key_press)
+        self.input_manager.register_callback("key_release", self.on_key_release)
+
         # register mouse move, press, and release callbacks
         self.input_manager.register_callback("left_click", self.on_left_click)
         self.input_manager.register_callback("left_release", self.on_left_release)
@@ -41,47 +94,294 @@ class BezierApp(App):
                 return True, node
         return False, None
 
+    def on_key_press(self, key, scancode, mods):
+        self._held_keys.add(key)
+
+    def on_key_release(self, key, scancode, mods):
+        self._held_keys.discard(key)
+
     def on_left_click(self, x, y):
+        # start a selection box
+        if self._held_keys & {glfw.KEY_LEFT_SHIFT, glfw.KEY_RIGHT_SHIFT}:
+            self._box_start = self._box_end = (x, y)
+            return
+
         is_on_node, node = self._is_on_node(x, y)
+
+        # start transforming the selection
+        if is_on_node and self.selection is not None and node in self.selection:
+            # the spline may have changed since the selection was made (e.g. auto-smoothing), start from it as it is
+            self.selection.begin()
+            self.frame.update(self.spline)
+            self._gesture_rows = self.frame.locate(self.spline, self.selection.affected)
+            self._gesture_anchor = (x, y)
+            self._gesture_origin = tuple(self.selection.centroid)
+            return
+
+        self.selection = None
         if is_on_node:
             self._dragging = True
             self._dragged_node = node
+            self._dragged_index = self._index_of(node)
         else:
             n = Node(x, y)
-            self.spline.push_nearest(n)
+            side = self.spline.push_nearest(n)
+            self._record("push", side=side, x=x, y=y)
+            if self.auto_smoothing:
+                index = 0 if side == "front" else len(self.spline) - 1
+                self._record_controls(auto_smooth_around(self.spline, n), n, index)
+            self._geometry_dirty = True
 
     def on_left_release(self, x, y):
+        if self._box_start is not None:
+            self.selection = Selection.from_box(self.spline, *self._box_start, x, y)
+            self._box_start = self._box_end = None
+
+        if self._gesture_anchor is not None:
+            self._record_transform()
+            self.selection.end_gesture()
+            self._gesture_anchor = self._gesture_origin = None
+            self._gesture_rows = None
+
+        # moves are journaled once per drag, where the point ended up
+        if self._dragged_index is not None:
+            # look the index up again, it's cheap and stays right even if nodes moved around during the drag
+            self._dragged_index = self._index_of(self._dragged_node)
+            self._record_move(self._dragged_node, *self._dragged_index)
+            if self._smoothed_nodes:
+                self._record_controls(self._smoothed_nodes, self._dragged_node, self._dragged_index[0])
+        self._smoothed_nodes = []
+
         self._dragging = False
         self._dragged_node = None
+        self._dragged_index = None
     
     def on_mouse_move(self, x, y):
-        if self._dragging and self._dragged_node:
+        self._cursor = (x, y)
+        if self._box_start is not None:
+            self._box_end = (x, y)
+        elif self._gesture_anchor is not None:
+            self._transform_selection(x, y)
+            self.frame.write_nodes(self._gesture_rows, *self.selection.affected_values())
+            self._geometry_dirty = True
+        elif self._dragging and self._dragged_node:
             self._dragged_node.set_position((x, y))
+            if self.auto_smoothing and isinstance(self._dragged_node, Node):
+                self._smoothed_nodes = auto_smooth_around(self.spline, self._dragged_node)
+            self._geometry_dirty = True
+
+    def _transform_selection(self, x, y):
+        ax, ay = self._gesture_anchor
+        ox, oy = self._gesture_origin
+
+        if glfw.KEY_S in self._held_keys:
+            start = hypot(ax - ox, ay - oy)
+            if start > 0:
+                self.selection.scale(hypot(x - ox, y - oy) / start, self._gesture_origin)
+        elif glfw.KEY_R in self._held_keys:
+            angle = atan2(y - oy, x - ox) - atan2(ay - oy, ax - ox)
+            self.selection.rotate(angle, self._gesture_origin)
+        else:
+            self.selection.translate(x - ax, y - ay)
+
+    def _record(self, op, **data):
+        if self.journal is None:
+            return
+        try:
+            self.journal.record(op, **data)
+        except RuntimeError as e:
+            # keep editing without autosave rather than crashing
+            print(f"Autosave disabled: {e.__cause__!r}")
+            self.journal = None
+
+    def _index_of(self, point):
+        """Returns (index of the node, "node", "previous" or "next") for a node or control point of the spline."""
+        if self.journal is None:
+            return None
+
+        node = point.parent if isinstance(point, ControlPoint) else point
+        i = self.spline.index_of(node)
+
+        if point is node:
+            return i, "node"
+        return i, "previous" if point is node.control_previous else "next"
+
+    def _record_controls(self, nodes, node, index):
+        """Journals the control points of consecutive nodes, node being at index in the spline."""
+        if self.journal is None or not nodes:
+            return
+
+        start = (index - nodes.index(node)) % len(self.spline)
+        self._record("controls", index=start, next=[[n.control_next._x, n.control_next._y] for n in nodes])
+
+    def _record_move(self, point, index, which):
+        self._record("move", index=index, point=which, x=point._x, y=point._y)
+
+    def _record_transform(self):
+        if self.journal is None or self.selection.last_transform is None:
+            return
+
+        index_of = self.spline.index_of
+        controls = [
+            [index_of(c.parent), "previous" if c is c.parent.control_previous else "next"]
+            for c in self.selection.control_points
+        ]
+        matrix, offset, origin = self.selection.last_transform
+        self._record(
+            "transform",
+            nodes=[index_of(n) for n in self.selection.nodes],
+            controls=controls,
+            matrix=matrix.tolist(),
+            offset=offset.tolist(),
+            origin=origin.tolist()
+        )
+
+    @override
+    def state(self) -> Document:
+        """The spline as journal rows, see src.journal."""
+        return document_from_spline(self.spline)
+
+    @override
+    def on_close(self):
+        if self.tessellation_worker is not None:
+            self.tessellation_worker.stop()
+        self.fill.stop()
+        if self.journal is not None:
+            self.journal.close()
+
+    def toggle_closed(self, key, scancode, mods):
+        # a selection gesture writes into the frame buffers as they were laid out when it started
+        if self._gesture_anchor is not None:
+            return
+        self.spline.set_closed(not self.spline.closed)
+        self._record("close", closed=self.spline.closed)
+        self._geometry_dirty = True
+
+    def toggle_auto_smoothing(self, key, scancode, mods):
+        if self._gesture_anchor is not None:
+            return
+        self.auto_smoothing = not self.auto_smoothing
+        if self.auto_smoothing:
+            auto_smooth(self.spline)
+            self._record("smooth")
+            self._geometry_dirty = True
+
+    def _is_editing(self) -> bool:
+        """Is a drag, a selection gesture or a selection box going on? The spline's structure shouldn't change then."""
+        return self._dragging or self._gesture_anchor is not None or self._box_start is not None
+
+    def insert_node(self, key, scancode, mods):
+        """Splits the curve at the point nearest to the cursor, if it's close enough."""
+        if self._is_editing():
+            return
+        nearest = self.spline.nearest_on_curve(*self._cursor)
+        if nearest is None:
+            return
+        segment, t, distance = nearest
+        if distance > self.tolerance * self.renderer.default_point_size or not 0 < t < 1:
+            return
+
+        node = self.spline.split_segment(segment, t)
+        previous, next = self.spline.neighbours(node)
+        self._record(
+            "insert",
+            index=segment + 1,
+            x=node._x,
+            y=node._y,
+            previous=[node.control_previous._x, node.control_previous._y],
+            next=[node.control_next._x, node.control_next._y],
+            before=[previous.control_next._x, previous.control_next._y],
+            after=[next.control_previous._x, next.control_previous._y]
+        )
+        self.selection = None
+        self._geometry_dirty = True
+
+    def delete_node(self, key, scancode, mods):
+        """Deletes the node under the cursor, merging the segments on both sides of it."""
+        if self._is_editing():
+            return
+        is_on_node, node = self._is_on_node(*self._cursor)
+        if not is_on_node or not isinstance(node, Node):
+            return
+
+        index = self.spline.index_of(node)
+        previous, next = self.spline.neighbours(node)
+        self.spline.delete_node(index)
+        self._record(
+            "delete",
+            index=index,
+            before=[previous.control_next._x, previous.control_next._y] if previous is not None else None,
+            after=[next.control_previous._x, next.control_previous._y] if next is not None else None
+        )
+        self.selection = None
+        self._geometry_dirty = True
 
     def reset(self, key, scancode, mods):
         self.spline = Spline() # reset the spline
+        self._record("reset")
+        self.selection = None
+        self._gesture_anchor = self._gesture_origin = None
+        self._gesture_rows = None
+        self._box_start = self._box_end = None
+
+        # a drag that was going on is over, its point is gone
+        self._dragging = False
+        self._dragged_node = None
+        self._dragged_index = None
+        self._smoothed_nodes = []
+        self._geometry_dirty = True
     
     def _draw_spline(self):
-        points = self.spline.unwrap_nodes_abs()
-        for i in range(0, len(points) - 3, 3):  # Iterate through groups of 4 points
-            self.renderer.draw_cubic_bezier(points[i:i+4])
-    
-    def _get_spline_handles(self):
-        points = []
-        for node in self.spline:
-            if node.control_next._enabled:
-                points += (node, node.control_next.get_absolute_position())
-            if node.control_previous._enabled:
-                points += (node, node.control_previous.get_absolute_position())
-        return points
+        curve_count = (self.frame.curve.count - 1) // 3
+        worker = self.tessellation_worker
+
+        # small splines are cheap enough to tessellate right here
+        if worker is None or curve_count < self.BACKGROUND_TESSELLATION_THRESHOLD:
+            self.renderer.draw_cubic_bezier_buffer(self.frame.curve)
+            self._geometry_dirty = True # make sure the worker gets a snapshot if the spline grows past the threshold
+            self._first_snapshot = None
+            return
+
+        if self._geometry_dirty:
+            snapshot = worker.submit(self.frame.curve)
+            if self._first_snapshot is None:
+                self._first_snapshot = snapshot
+            self._geometry_dirty = False
+
+        # draw whatever the worker finished last, once it has caught up with the spline. Until then its front
+        # buffer is empty or holds some older spline from before it was last drawn here.
+        front = worker.front()
+        if worker.front_generation < self._first_snapshot:
+            self.renderer.draw_cubic_bezier_buffer(self.frame.curve)
+        else:
+            self.renderer.draw_line_strips(front, worker.strip_length)
+
+    def _draw_selection(self):
+        if self.selection is not None:
+            self.renderer.draw_point_buffer(self.selection.highlight, color=colors.RED)
+
+        if self._box_start is not None:
+            (x0, y0), (x1, y1) = self._box_start, self._box_end
+            corners = ((x0, y0), (x1, y0), (x1, y1), (x0, y1))
+            edges = [p for i in range(4) for p in (corners[i], corners[(i + 1) % 4])]
+            self.renderer.draw_dotted_lines(edges, color=colors.RED)
 
     def draw(self):
+        # write the spline into the frame buffers, a selection gesture writes its part of them on its own
+        if self._gesture_anchor is None:
+            self.frame.update(self.spline)
+
+        # fill closed paths, the triangles are only recomputed when the outline changes
+        if self.spline.closed and len(self.spline) > 2:
+            self.renderer.draw_triangle_buffer(self.fill.update(self.frame.curve), color=(0.85, 0.9, 1))
+
         # draw the nodes
-        self.renderer.draw_points(self.spline.get_nodes())
+        self.renderer.draw_point_buffer(self.frame.nodes, color=colors.BLUE)
         # draw the control points
-        self.renderer.draw_points(self.spline.get_control_points_abs(), round=True)
+        self.renderer.draw_point_buffer(self.frame.control_points, round=True)
         # draw the spline
         self._draw_spline()
         # draw the control point handles
-        self.renderer.draw_dotted_lines(self._get_spline_handles(), color=(0, 0.8, 0.6), scale_factor=2)
-        
\ No newline at end of file
+        self.renderer.draw_dotted_line_buffer(self.frame.handles, color=(0, 0.8, 0.6), scale_factor=2)
+        # draw the selection
+        self._draw_selection()
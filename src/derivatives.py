@@ -0,0 +1,72 @@
+import numpy as np
+
+from engine.curves import evaluate_bezier_at, hodograph
+
+class SplineDerivatives:
+    """
+    The control points of a spline's segments along with their first and second hodographs
+    i.e., the control points of the first and second derivative of every segment.
+    All queries are vectorized over many (segment, t) pairs.
+    """
+    def __init__(self, control_points: np.ndarray, closed: bool=False):
+        self.control_points = control_points # (segments, 4, 2)
+        self.closed = closed # does the last segment end where the first one starts?
+        self.first = hodograph(control_points) # (segments, 3, 2)
+        self.second = hodograph(self.first) # (segments, 2, 2)
+
+    def __len__(self):
+        return len(self.control_points)
+
+    def points(self, segments, t) -> np.ndarray:
+        """The positions at the (segment, t) pairs, shape (len(t), 2)."""
+        return evaluate_bezier_at(self.control_points, segments, t)
+
+    def first_derivatives(self, segments, t) -> np.ndarray:
+        return evaluate_bezier_at(self.first, segments, t)
+
+    def second_derivatives(self, segments, t) -> np.ndarray:
+        return evaluate_bezier_at(self.second, segments, t)
+
+    def frames(self, segments, t) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Evaluates the unit tangents, unit normals and signed curvature at the (segment, t) pairs.
+        Normals are the tangents rotated 90 degrees counter clockwise and curvature is positive when the curve turns
+        that way. Where the first derivative vanishes the tangent and normal are (0, 0) and the curvature is 0.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: tangents (k, 2), normals (k, 2) and curvature (k,).
+        """
+        d1 = self.first_derivatives(segments, t)
+        d2 = self.second_derivatives(segments, t)
+
+        speed = np.hypot(d1[:, 0], d1[:, 1])
+        degenerate = speed == 0
+        safe_speed = np.where(degenerate, 1, speed)
+
+        tangents = d1 / safe_speed[:, None]
+        normals = np.stack((-tangents[:, 1], tangents[:, 0]), axis=1)
+        curvature = np.where(degenerate, 0, (d1[:, 0] * d2[:, 1] - d1[:, 1] * d2[:, 0]) / safe_speed ** 3)
+        return tangents, normals, curvature
+
+    def g1_continuous(self, tolerance: float=1e-6) -> np.ndarray:
+        """
+        Checks whether the curve is G1 continuous at every node between two segments i.e., whether the tangent
+        at the end of each segment points the same way as the tangent at the start of the next one.
+        On a closed curve that includes the start node, where the last segment meets the first one.
+        The colinear control point pairs of the nodes should always pass.
+
+        Args:
+            tolerance (float, optional): The largest accepted sine of the angle between the tangents. Defaults to 1e-6.
+
+        Returns:
+            np.ndarray: One bool per joint, shape (segments - 1,) or (segments,) when closed, the wrap joint last.
+        """
+        end = self.first[:, -1]
+        start = np.roll(self.first[:, 0], -1, axis=0)
+        if not self.closed:
+            end, start = end[:-1], start[:-1]
+
+        cross = end[:, 0] * start[:, 1] - end[:, 1] * start[:, 0]
+        dot = np.einsum("kd,kd->k", end, start)
+        lengths = np.hypot(end[:, 0], end[:, 1]) * np.hypot(start[:, 0], start[:, 1])
+        return (lengths > 0) & (dot > 0) & (np.abs(cross) <= tolerance * lengths)
@@ -0,0 +1,162 @@
+"""
+Exports splines to PNG images of any size (30000 x 30000 is fine) without a GL context.
+
+The image is rendered with the CPU rasterizer one tile at a time, a row of tiles after another. Every tile only
+draws the segments, handles and points whose bounding boxes reach into it, and every finished row of tiles is
+compressed straight into the file. So besides the spline's own geometry only one row of tiles worth of 8 bit
+pixels and a single float tile are in memory at any time, however big the image is.
+
+    python -m src.export .autosave drawing.png 30000 30000
+"""
+import argparse
+
+import numpy as np
+
+from engine.curves import cubic_bounding_boxes, flatten_resolution
+from engine.png import PngWriter
+from engine.raster import Raster
+
+from .frame import FrameBuffers
+from .spline import Spline
+from .thumbnail import draw_parts, fill_triangles, fit, spline_bounds
+
+def export_png(
+        spline: Spline,
+        path: str,
+        width: int,
+        height: int,
+        bounds=None,
+        margin: float=0,
+        tile_size: int=512,
+        line_width: float=2,
+        point_size: float=5,
+        handles: bool=True,
+        tolerance: float=0.25,
+        compression: int=6
+    ):
+    """
+    Renders a spline into a width x height PNG file, tile by tile.
+
+    Args:
+        spline (Spline): What to draw.
+        path (str): The file to write.
+        width (int): The image width in pixels.
+        height (int): The image height in pixels.
+        bounds (array like, optional): The canvas box (min x, min y, max x, max y) to export, fitted in the image and
+            centered. Defaults to the box around the whole spline.
+        margin (float, optional): Pixels kept free around the bounds. Defaults to 0.
+        tile_size (int, optional): The side of the tiles in pixels. Defaults to 512.
+        line_width (float, optional): The curve's width in canvas units, it grows with the image. Defaults to 2.
+        point_size (float, optional): The size of the nodes in canvas units, 0 to leave the points out. Defaults to 5.
+        handles (bool, optional): Draw the control points and their handles. Defaults to True.
+        tolerance (float, optional): How far in pixels the flattened curve may be from the real one. Defaults to 0.25.
+        compression (int, optional): The zlib level, 0 to 9. Defaults to 6.
+    """
+    if bounds is None:
+        bounds = spline_bounds(spline)
+    if bounds is None:
+        bounds = (0, 0, width, height)
+    origin, scale = fit(bounds, width, height, margin)
+    line_width *= scale
+    point_size *= scale
+
+    frame = FrameBuffers()
+    frame.update(spline)
+    segments = spline.segment_control_points()
+    handle_lines = frame.handles.view().reshape(-1, 2, 2).astype(np.float64)
+    nodes = frame.nodes.view().astype(np.float64)
+    control_points = frame.control_points.view().astype(np.float64)
+
+    # the same resolution for every tile, otherwise the curve could be flattened differently on both sides of a seam
+    resolution = flatten_resolution(segments * scale, tolerance)
+    fill = fill_triangles(spline, frame, resolution)
+    if fill is None:
+        fill = np.empty((0, 3, 2))
+
+    # pixel space boxes of everything, grown by how far the strokes and points reach out of them
+    stroke_reach = line_width / 2 + 1
+    point_reach = point_size / 2 + 1
+    segment_boxes = _to_pixels(cubic_bounding_boxes(segments), origin, scale, height, stroke_reach)
+    handle_boxes = _to_pixels(_line_boxes(handle_lines), origin, scale, height, 1.5)
+    node_boxes = _to_pixels(np.concatenate((nodes, nodes), axis=1), origin, scale, height, point_reach)
+    control_boxes = _to_pixels(np.concatenate((control_points, control_points), axis=1), origin, scale, height, point_reach)
+    fill_boxes = _to_pixels(np.concatenate((fill.min(axis=1), fill.max(axis=1)), axis=1), origin, scale, height, 1)
+    all_boxes = (segment_boxes, handle_boxes, node_boxes, control_boxes, fill_boxes)
+
+    band = np.empty((min(tile_size, height), width, 3), dtype=np.uint8)
+    with PngWriter(path, width, height, compression) as writer:
+        for y0 in range(0, height, tile_size):
+            y1 = min(y0 + tile_size, height)
+            in_band = [
+                _overlapping(boxes, np.arange(len(boxes)), 1, y0, y1)
+                for boxes in all_boxes
+            ]
+
+            for x0 in range(0, width, tile_size):
+                x1 = min(x0 + tile_size, width)
+                selected = [
+                    _overlapping(boxes, indices, 0, x0, x1)
+                    for boxes, indices in zip(all_boxes, in_band)
+                ]
+
+                # most tiles of a big export are empty
+                if not any(len(s) for s in selected):
+                    band[:y1 - y0, x0:x1] = 255
+                    continue
+
+                # the canvas is y up and the rows go down, the tile's bottom left corner is row y1
+                tile = Raster(x1 - x0, y1 - y0, origin=origin + np.array((x0, height - y1)) / scale, scale=scale)
+                draw_parts(
+                    tile,
+                    segments[selected[0]],
+                    resolution,
+                    handle_lines[selected[1]],
+                    nodes[selected[2]],
+                    control_points[selected[3]],
+                    line_width,
+                    point_size,
+                    handles,
+                    fill[selected[4]]
+                )
+                band[:y1 - y0, x0:x1] = tile.to_uint8()
+
+            writer.write_rows(band[:y1 - y0])
+
+def _line_boxes(lines: np.ndarray) -> np.ndarray:
+    return np.concatenate((lines.min(axis=1), lines.max(axis=1)), axis=1)
+
+def _to_pixels(boxes: np.ndarray, origin: np.ndarray, scale: float, height: int, reach: float) -> np.ndarray:
+    """Maps canvas boxes to image boxes like Raster.to_pixels does with points, the y bounds swap."""
+    boxes = (np.asarray(boxes, dtype=np.float64).reshape(-1, 4) - np.tile(origin, 2)) * scale
+    boxes[:, [1, 3]] = height - boxes[:, [3, 1]]
+    return boxes + np.array((-reach, -reach, reach, reach))
+
+def _overlapping(boxes: np.ndarray, indices: np.ndarray, axis: int, low: float, high: float) -> np.ndarray:
+    """The indices of the boxes that overlap [low, high] along an axis, 0 for x and 1 for y."""
+    return indices[(boxes[indices, axis + 2] >= low) & (boxes[indices, axis] <= high)]
+
+def main():
+    from .journal import recover_spline
+
+    parser = argparse.ArgumentParser(description="Export an autosaved document to a PNG image of any size")
+    parser.add_argument("autosave", help="the autosave directory of the document")
+    parser.add_argument("output", help="the PNG file to write")
+    parser.add_argument("width", type=int)
+    parser.add_argument("height", type=int)
+    parser.add_argument("--margin", type=float, default=0, help="pixels kept free around the drawing (default: 0)")
+    parser.add_argument("--tile-size", type=int, default=512, help="the side of the tiles in pixels (default: 512)")
+    parser.add_argument("--no-handles", action="store_true", help="only draw the curve and the nodes")
+    args = parser.parse_args()
+
+    export_png(
+        recover_spline(args.autosave),
+        args.output,
+        args.width,
+        args.height,
+        margin=args.margin,
+        tile_size=args.tile_size,
+        handles=not args.no_handles
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import threading
+
+import numpy as np
+
+from engine import PointBuffer
+from engine.curves import tessellate_bezier_chain
+from engine.triangulate import triangulate_polygon
+
+class FillCache:
+    """
+    Triangulates the inside of a closed spline and keeps the triangles until the outline changes.
+
+    The cache is keyed on the spline's bezier chain (its control polygon): the flattened outline only changes
+    when the chain does, and comparing the chain is a single vectorized comparison, so unchanged shapes cost
+    next to nothing per frame.
+
+    Triangulating is still O(n^2) in the worst case, too slow to redo every frame of a drag on a big path. With
+    `background` on, outlines of more than BACKGROUND_THRESHOLD points are triangulated on a worker thread
+    while update() keeps returning the last finished triangles, like TessellationWorker does for the curve.
+    """
+    BACKGROUND_THRESHOLD = 1024 # outline points, smaller outlines take a few ms and are triangulated right away
+
+    def __init__(self, resolution: int=16, background: bool=False):
+        self.resolution = resolution # line segments per bezier when flattening the outline
+        self.triangles = PointBuffer() # 3 consecutive points per triangle
+
+        self._key = np.empty((0, 2), dtype=np.float32)
+        self._outline = PointBuffer()
+
+        # background triangulation, the worker fills _finished from the latest _pending chain
+        self._worker = None
+        if background:
+            self._lock = threading.Lock()
+            self._wakeup = threading.Condition(self._lock)
+            self._pending: tuple[int, PointBuffer] | None = None
+            self._finished: tuple[int, PointBuffer] | None = None
+            self._submitted = 0 # chains handed to the worker so far
+            self._inline = 0 # how many had been handed over when the last inline triangulation was done
+            self._running = True
+            self._worker = threading.Thread(target=self._run, name="fill-triangulation", daemon=True)
+            self._worker.start()
+
+    def update(self, curve: PointBuffer) -> PointBuffer:
+        """
+        Returns the triangles filling the closed bezier chain in `curve`, triangulating only if the chain changed.
+
+        Args:
+            curve (PointBuffer): The chain of a closed spline, see FrameBuffers.curve.
+        """
+        if self._worker is not None:
+            self._take_finished()
+
+        chain = curve.view()
+        if chain.shape == self._key.shape and np.array_equal(chain, self._key):
+            return self.triangles
+        self._key = chain.copy()
+
+        # the first fill of a shape, or a small one, is done right away so it never shows up late
+        outline_size = (curve.count - 1) * self.resolution // 3
+        if self._worker is None or self.triangles.count == 0 or outline_size <= self.BACKGROUND_THRESHOLD:
+            if self._worker is not None:
+                # whatever the worker is on is older than this now
+                with self._lock:
+                    self._pending = None
+                    self._inline = self._submitted
+            self._triangulate(curve, self._outline, self.triangles)
+            return self.triangles
+
+        snapshot = PointBuffer(curve.count)
+        snapshot.data[:curve.count] = curve.data[:curve.count]
+        snapshot.count = curve.count
+        with self._lock:
+            self._submitted += 1
+            self._pending = (self._submitted, snapshot) # replaces an older chain the worker hasn't started on
+            self._wakeup.notify()
+        return self.triangles
+
+    def stop(self):
+        """Stops the background worker, if there is one."""
+        if self._worker is None:
+            return
+        with self._lock:
+            self._running = False
+            self._wakeup.notify()
+        self._worker.join()
+        self._worker = None
+
+    def _take_finished(self):
+        with self._lock:
+            finished, self._finished = self._finished, None
+            # results for chains submitted before the last inline triangulation are out of date
+            if finished is not None and finished[0] > self._inline:
+                self.triangles = finished[1]
+
+    def _run(self):
+        outline = PointBuffer()
+        while True:
+            with self._lock:
+                while self._running and self._pending is None:
+                    self._wakeup.wait()
+                if not self._running:
+                    return
+                (generation, chain), self._pending = self._pending, None
+
+            triangles = PointBuffer()
+            self._triangulate(chain, outline, triangles)
+            with self._lock:
+                self._finished = (generation, triangles)
+
+    def _triangulate(self, curve: PointBuffer, outline_buffer: PointBuffer, triangles: PointBuffer):
+        tessellate_bezier_chain(curve, outline_buffer, 3, self.resolution)
+
+        # consecutive curves share an end point, drop it (and the repeated start) to get a plain polygon
+        strips = outline_buffer.view().reshape(-1, self.resolution + 1, 2)
+        outline = strips[:, :-1].reshape(-1, 2)
+
+        if len(outline) < 3:
+            triangles.count = 0
+            return
+
+        indices = triangulate_polygon(outline).ravel()
+        triangles.reserve(len(indices))
+        triangles.data[:len(indices)] = outline[indices]
+        triangles.count = len(indices)
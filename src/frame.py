@@ -0,0 +1,162 @@
+import numpy as np
+
+from engine import PointBuffer
+
+from .spline import Spline
+
+class NodeRows:
+    """Where some nodes and their control points are in the frame buffers, see FrameBuffers.locate."""
+    def __init__(self, nodes, previous_control, next_control, previous_curve, node_curve, next_curve, closing):
+        self.nodes = nodes # rows in nodes and curve positions below, one per node
+        self.previous_control = previous_control # rows in control_points, -1 if disabled. Handles are at 2 * row.
+        self.next_control = next_control
+        self.previous_curve = previous_curve # rows in curve, -1 if not in the chain
+        self.node_curve = node_curve
+        self.next_curve = next_curve
+        self.closing = closing # (index among the nodes, curve row) of the start repeated at the end of a closed chain, or None
+
+class FrameBuffers:
+    """
+    Holds the absolute coordinates of everything that gets drawn in a frame.
+    The buffers are reused between frames and only grow when the spline does,
+    so updating them doesn't create any Point objects or lists.
+    """
+    def __init__(self):
+        self.nodes = PointBuffer()
+        self.control_points = PointBuffer()
+        self.handles = PointBuffer() # pairs of (node, control point)
+        self.curve = PointBuffer() # control points of the bezier chain, in order
+
+    def update(self, spline: Spline):
+        """Writes the spline's current nodes, control points, handles and bezier chain into the buffers."""
+        n = len(spline)
+        self.nodes.reserve(n)
+        self.control_points.reserve(2 * n)
+        self.handles.reserve(4 * n)
+        self.curve.reserve(3 * n + 2)
+
+        nodes = self.nodes.data
+        control_points = self.control_points.data
+        handles = self.handles.data
+        curve = self.curve.data
+
+        closed = spline.closed and n > 1
+        start = spline.start
+
+        i = c = h = k = 0
+        for node in spline:
+            x, y = node._x, node._y
+            nodes[i, 0] = x
+            nodes[i, 1] = y
+            i += 1
+
+            control = node.control_previous
+            if control._enabled:
+                cx, cy = x + control._x, y + control._y
+                control_points[c, 0] = curve[k, 0] = handles[h + 1, 0] = cx
+                control_points[c, 1] = curve[k, 1] = handles[h + 1, 1] = cy
+                handles[h, 0] = x
+                handles[h, 1] = y
+                c += 1
+                k += 1
+                h += 2
+
+                # the start's previous control point belongs to the closing segment, at the end of the chain
+                if closed and node is start:
+                    k -= 1
+
+            curve[k, 0] = x
+            curve[k, 1] = y
+            k += 1
+
+            control = node.control_next
+            if control._enabled:
+                cx, cy = x + control._x, y + control._y
+                control_points[c, 0] = curve[k, 0] = handles[h + 1, 0] = cx
+                control_points[c, 1] = curve[k, 1] = handles[h + 1, 1] = cy
+                handles[h, 0] = x
+                handles[h, 1] = y
+                c += 1
+                k += 1
+                h += 2
+
+        # close the chain: the end's next control point is already in, add the start's previous one and the start
+        if closed:
+            control = start.control_previous
+            curve[k, 0] = start._x + control._x
+            curve[k, 1] = start._y + control._y
+            curve[k + 1, 0] = start._x
+            curve[k + 1, 1] = start._y
+            k += 2
+
+        self.nodes.count = i
+        self.control_points.count = c
+        self.handles.count = h
+        self.curve.count = k
+
+    def locate(self, spline: Spline, nodes) -> NodeRows:
+        """
+        Finds where update() put some nodes of the spline and their control points, so they can be rewritten
+        with write_nodes() while the spline's structure (its nodes, their order, which control points are on and
+        whether it's closed) stays the same.
+        """
+        n = len(spline)
+        previous_on = np.fromiter((node.control_previous._enabled for node in spline), dtype=np.intp, count=n)
+        next_on = np.fromiter((node.control_next._enabled for node in spline), dtype=np.intp, count=n)
+        closed = spline.closed and n > 1
+
+        # every node adds its enabled control points, previous then next, and two handle points for each
+        per_node = previous_on + next_on
+        controls_before = np.cumsum(per_node) - per_node
+        previous_control = np.where(previous_on > 0, controls_before, -1)
+        next_control = np.where(next_on > 0, controls_before + previous_on, -1)
+
+        # same in the chain, except that the start's previous control point of a closed path goes at the end
+        in_chain = previous_on.copy()
+        if closed:
+            in_chain[0] = 0
+        per_node = in_chain + 1 + next_on
+        chain_before = np.cumsum(per_node) - per_node
+        previous_curve = np.where(in_chain > 0, chain_before, -1)
+        node_curve = chain_before + in_chain
+        next_curve = np.where(next_on > 0, node_curve + 1, -1)
+        if closed:
+            previous_curve[0] = per_node.sum()
+
+        rows = np.array([spline.index_of(node) for node in nodes], dtype=np.intp)
+        closing = None
+        if closed and (rows == 0).any():
+            closing = (int(np.flatnonzero(rows == 0)[0]), int(per_node.sum()) + 1)
+        return NodeRows(
+            rows, previous_control[rows], next_control[rows], previous_curve[rows], node_curve[rows], next_curve[rows], closing
+        )
+
+    def write_nodes(self, rows: NodeRows, positions, previous, next):
+        """
+        Rewrites nodes found with locate() in all the buffers at once.
+
+        Args:
+            rows (NodeRows): Where the nodes are.
+            positions (array like): The (count, 2) new positions of the nodes.
+            previous, next (array like): The (count, 2) new offsets of their control points.
+        """
+        positions = np.asarray(positions)
+        self.nodes.data[rows.nodes] = positions
+        self.curve.data[rows.node_curve] = positions
+
+        for offsets, control_rows, curve_rows in (
+            (previous, rows.previous_control, rows.previous_curve),
+            (next, rows.next_control, rows.next_curve)
+        ):
+            points = positions + offsets
+            on = control_rows >= 0
+            c = control_rows[on]
+            self.control_points.data[c] = points[on]
+            self.handles.data[2 * c] = positions[on]
+            self.handles.data[2 * c + 1] = points[on]
+            in_chain = curve_rows >= 0
+            self.curve.data[curve_rows[in_chain]] = points[in_chain]
+
+        if rows.closing is not None:
+            i, row = rows.closing
+            self.curve.data[row] = positions[i]
@@ -0,0 +1,404 @@
+"""
+Append-only edit journal with background autosave.
+
+Every edit is appended to `journal.log` (one JSON object per line) by a writer thread that fsyncs once per batch.
+The writer also keeps its own copy of the document by applying the edits to a list of rows, and every
+`snapshot_every` edits it writes that copy to `snapshot.npz` and starts a new, empty journal. Recovering
+therefore only loads the snapshot and replays the edits written after it.
+
+A document is a list of rows and whether the path is closed. A row is
+[x, y, previous x, previous y, next x, next y, previous enabled, next enabled],
+the control point coordinates being relative to the node like in ControlPoint.
+"""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import warnings
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .node import Node
+from .smooth import smooth_offsets
+from .spline import Spline
+
+JOURNAL_FILE = "journal.log"
+SNAPSHOT_FILE = "snapshot.npz"
+RESET_BACKUP_FILE = "before_reset.npz" # the document as it was before the last reset
+
+_POINTS = {"node": 0, "previous": 2, "next": 4}
+
+@dataclass
+class Document:
+    rows: list[list[float]] = field(default_factory=list)
+    closed: bool = False
+
+class EditJournal:
+    """
+    Records edits without blocking the caller, see the module docstring.
+
+    Edits are recorded as (op, data) pairs:
+        push      side ("front" or "back"), x, y
+        pop       side
+        move      index, point ("node", "previous" or "next"), x, y. Control point coordinates are relative.
+        transform nodes (indices), controls ([index, point] pairs), matrix (2x2), offset, origin. See Selection.apply.
+        close     closed (bool)
+        smooth    (auto-smooths the whole path)
+        controls  index, next (list of [x, y]). Sets the next control point of consecutive nodes starting at index,
+                  wrapping around, their previous control points mirror them.
+        insert    index, x, y, previous, next, before, after. Inserts a node at index with the given control points.
+                  before and after (or None) are the next control point of the node before it and the previous
+                  control point of the node after it, wrapping around. None of these are mirrored.
+        delete    index, before, after. Removes the node at index, before and after are set on its old neighbours
+                  like for insert.
+        reset
+    """
+    def __init__(self, directory: str, snapshot_every: int=5000, batch_size: int=256, before_reset: bool=False):
+        """
+        Args:
+            directory (str): Where the journal and snapshots live, created if needed.
+            snapshot_every (int, optional): How many edits between two snapshots. Defaults to 5000.
+            batch_size (int, optional): The most edits written per fsync. Defaults to 256.
+            before_reset (bool, optional): Start from the document as it was before the last reset. Defaults to False.
+        """
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.batch_size = batch_size
+        os.makedirs(directory, exist_ok=True)
+
+        # pick up where the files on disk left off
+        self._document, self._seq = load_document(directory)
+        self._since_snapshot = 0
+        self._file = open(os.path.join(directory, JOURNAL_FILE), "a", encoding="utf-8")
+
+        if before_reset:
+            self._document, _ = load_document(directory, before_reset=True)
+            self._seq += 1
+            self._compact(self._seq)
+
+        # the document the journal starts from, build the editor's spline from it
+        self.recovered = spline_from_document(self._document)
+
+        # set if the writer stopped, nothing is saved after that
+        self.error: BaseException | None = None
+
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="edit-journal", daemon=True)
+        self._thread.start()
+
+    def record(self, op: str, **data):
+        """
+        Queues an edit, returns immediately.
+
+        Raises:
+            RuntimeError: If the writer stopped because of an error, see `error`.
+        """
+        if self.error is not None:
+            raise RuntimeError("the edit journal stopped, edits aren't saved anymore") from self.error
+        self._seq += 1
+        data["seq"] = self._seq
+        data["op"] = op
+        self._queue.put(data)
+
+    def close(self):
+        """Writes everything that's queued and stops the writer."""
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+    def _run(self):
+        try:
+            self._write_batches()
+        except BaseException as e:
+            # don't die silently, record() reports it from now on
+            self.error = e
+            warnings.warn(f"the edit journal stopped: {e!r}", RuntimeWarning)
+
+    def _write_batches(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            closing = batch[-1] is None
+            entries = [e for e in batch if e is not None]
+            if entries:
+                self._file.write("".join(json.dumps(e, separators=(",", ":")) + "\n" for e in entries))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+                for entry in entries:
+                    if entry["op"] == "reset":
+                        _write_snapshot(os.path.join(self.directory, RESET_BACKUP_FILE), self._document, entry["seq"])
+                    # the entry is in the journal already, loading skips it the same way
+                    _apply_or_skip(self._document, entry)
+                    self._since_snapshot += 1
+
+                if self._since_snapshot >= self.snapshot_every:
+                    self._compact(entries[-1]["seq"])
+
+            if closing:
+                return
+
+    def _compact(self, seq: int):
+        """Writes the current document as the snapshot and empties the journal."""
+        _write_snapshot(os.path.join(self.directory, SNAPSHOT_FILE), self._document, seq)
+
+        path = os.path.join(self.directory, JOURNAL_FILE)
+        self._file.close()
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        self._file = open(path, "a", encoding="utf-8")
+        self._since_snapshot = 0
+
+def apply_edit(document: Document, entry: dict):
+    """
+    Applies a journal entry to a document, mirroring what the edit did to the Spline.
+
+    Raises:
+        ValueError: If the entry doesn't fit the document (e.g. an index past its end) or isn't a known edit.
+            The document isn't changed then.
+    """
+    rows = document.rows
+    op = entry["op"]
+    _check_entry(document, entry)
+
+    if op == "push":
+        # same as Node.__init__, the previous control point is on and 50 units up
+        row = [entry["x"], entry["y"], 0.0, 50.0, -0.0, -50.0, 1.0, 0.0]
+        if not rows:
+            rows.append(row)
+        elif entry["side"] == "back":
+            # linking re-checks the control points of both ends
+            rows[-1][6], rows[-1][7] = float(len(rows) > 1), 1.0
+            row[6], row[7] = 1.0, 0.0
+            rows.append(row)
+        else:
+            rows[0][6], rows[0][7] = 1.0, float(len(rows) > 1)
+            row[6], row[7] = 0.0, 1.0
+            rows.insert(0, row)
+
+    elif op == "pop":
+        if not rows:
+            return
+        if entry["side"] == "back":
+            rows.pop()
+            if rows:
+                rows[-1][6], rows[-1][7] = float(len(rows) > 1), 0.0
+        else:
+            rows.pop(0)
+            if rows:
+                rows[0][6], rows[0][7] = 0.0, float(len(rows) > 1)
+
+    elif op == "move":
+        row = rows[entry["index"]]
+        i = _POINTS[entry["point"]]
+        row[i], row[i + 1] = entry["x"], entry["y"]
+        # control points are paired, the other one mirrors
+        if i == 2:
+            row[4], row[5] = -entry["x"], -entry["y"]
+        elif i == 4:
+            row[2], row[3] = -entry["x"], -entry["y"]
+
+    elif op == "transform":
+        matrix = np.asarray(entry["matrix"], dtype=np.float64).T
+        offset = np.asarray(entry["offset"], dtype=np.float64)
+        origin = np.asarray(entry["origin"], dtype=np.float64)
+
+        nodes = entry["nodes"]
+        if nodes:
+            selected = np.array([rows[i][:6] for i in nodes], dtype=np.float64)
+            positions = (selected[:, 0:2] - origin) @ matrix + origin + offset
+            previous = selected[:, 2:4] @ matrix
+            next = selected[:, 4:6] @ matrix
+            for i, p, pp, pn in zip(nodes, positions.tolist(), previous.tolist(), next.tolist()):
+                rows[i][0:6] = p + pp + pn
+
+        for i, point in entry["controls"]:
+            row = rows[i]
+            j = _POINTS[point]
+            parent = np.array(row[0:2])
+            absolute = (parent + row[j:j + 2] - origin) @ matrix + origin + offset
+            x, y = (absolute - parent).tolist()
+            row[j], row[j + 1] = x, y
+            k = 4 if j == 2 else 2
+            row[k], row[k + 1] = -x, -y
+
+    elif op == "close":
+        document.closed = entry["closed"]
+        if not document.closed and len(rows) > 1:
+            rows[-1][7] = rows[0][6] = 0.0
+
+    elif op == "smooth":
+        if len(rows) > 1:
+            knots = np.array([row[0:2] for row in rows], dtype=np.float64)
+            for row, (x, y) in zip(rows, smooth_offsets(knots, document.closed).tolist()):
+                row[2:6] = [-x, -y, x, y]
+
+    elif op == "controls":
+        start = entry["index"]
+        for k, (x, y) in enumerate(entry["next"]):
+            rows[(start + k) % len(rows)][2:6] = [-x, -y, x, y]
+
+    elif op == "insert":
+        index = entry["index"]
+        row = [entry["x"], entry["y"], *entry["previous"], *entry["next"], 1.0, 1.0]
+        # the same links as push, a node in the middle has both control points on
+        if not rows:
+            row[7] = 0.0
+        elif index == len(rows):
+            rows[-1][6], rows[-1][7] = float(len(rows) > 1), 1.0
+            row[7] = 0.0
+        elif index == 0:
+            rows[0][6], rows[0][7] = 1.0, float(len(rows) > 1)
+            row[6] = 0.0
+        rows.insert(index, row)
+        _set_neighbours(document, index - 1, index + 1, entry)
+
+    elif op == "delete":
+        index = entry["index"]
+        rows.pop(index)
+        if rows and index == 0:
+            rows[0][6], rows[0][7] = 0.0, float(len(rows) > 1)
+        elif rows and index == len(rows):
+            rows[-1][6], rows[-1][7] = float(len(rows) > 1), 0.0
+        _set_neighbours(document, index - 1, index, entry)
+
+    elif op == "reset":
+        rows.clear()
+        document.closed = False
+
+    else:
+        raise ValueError(f"unknown journal op {op!r}")
+
+    # like Spline, a closed path keeps the control points of the closing segment on
+    if document.closed and len(rows) > 1:
+        rows[-1][7] = rows[0][6] = 1.0
+
+def _check_entry(document: Document, entry: dict):
+    # everything that could fail half way through an edit is checked before anything changes
+    count = len(document.rows)
+    op = entry["op"]
+
+    def check(index, end):
+        if not isinstance(index, int) or not 0 <= index < end:
+            raise ValueError(f"{op} index {index!r} out of range for {count} nodes")
+
+    try:
+        if op == "move":
+            check(entry["index"], count)
+            if entry["point"] not in _POINTS:
+                raise ValueError(f"unknown point {entry['point']!r}")
+        elif op == "transform":
+            for index in entry["nodes"]:
+                check(index, count)
+            for index, point in entry["controls"]:
+                check(index, count)
+                if point not in ("previous", "next"):
+                    raise ValueError(f"unknown control point {point!r}")
+        elif op == "controls" and entry["next"]:
+            check(entry["index"], count)
+        elif op == "insert":
+            check(entry["index"], count + 1)
+        elif op == "delete":
+            check(entry["index"], count)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"malformed {op} entry: {e!r}") from e
+
+def _apply_or_skip(document: Document, entry: dict):
+    try:
+        apply_edit(document, entry)
+    except (ValueError, KeyError, TypeError) as e:
+        warnings.warn(f"skipped journal entry {entry.get('seq')}: {e}", RuntimeWarning)
+
+def _set_neighbours(document: Document, before: int, after: int, entry: dict):
+    rows = document.rows
+    if not rows:
+        return
+    # only a closed path wraps around
+    if entry["before"] is not None and (0 <= before or document.closed):
+        rows[before % len(rows)][4:6] = entry["before"]
+    if entry["after"] is not None and (after < len(rows) or document.closed):
+        rows[after % len(rows)][2:4] = entry["after"]
+
+def load_document(directory: str, before_reset: bool=False) -> tuple[Document, int]:
+    """
+    Loads the latest snapshot and replays the journal written after it.
+    A journal line that was cut short by a crash ends the replay.
+
+    Args:
+        directory (str): The journal directory.
+        before_reset (bool, optional): Load the document as it was right before the last reset instead. Defaults to False.
+
+    Returns:
+        tuple[Document, int]: The document and the sequence number of the last edit in it.
+    """
+    if before_reset:
+        return _read_snapshot(os.path.join(directory, RESET_BACKUP_FILE))
+
+    document, seq = _read_snapshot(os.path.join(directory, SNAPSHOT_FILE))
+
+    path = os.path.join(directory, JOURNAL_FILE)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if entry.get("seq", 0) <= seq:
+                    continue
+                _apply_or_skip(document, entry)
+                seq = entry["seq"]
+    return document, seq
+
+def recover_spline(directory: str, before_reset: bool=False) -> Spline:
+    """Rebuilds the spline saved in a journal directory, see load_document."""
+    document, _ = load_document(directory, before_reset)
+    return spline_from_document(document)
+
+def spline_from_document(document: Document) -> Spline:
+    spline = Spline()
+    spline.extend([Node(x, y) for x, y, *_ in document.rows])
+    spline.set_closed(document.closed)
+
+    # the links turned the control points on and off, set them to what was saved
+    for node, (_, _, px, py, nx, ny, previous_enabled, next_enabled) in zip(spline, document.rows):
+        node.control_previous._x, node.control_previous._y = px, py
+        node.control_next._x, node.control_next._y = nx, ny
+        node.control_previous._enabled = bool(previous_enabled)
+        node.control_next._enabled = bool(next_enabled)
+    return spline
+
+def document_from_spline(spline: Spline) -> Document:
+    """The rows of a spline, the reverse of spline_from_document."""
+    rows = [
+        [
+            node._x, node._y,
+            node.control_previous._x, node.control_previous._y,
+            node.control_next._x, node.control_next._y,
+            float(node.control_previous._enabled), float(node.control_next._enabled)
+        ]
+        for node in spline
+    ]
+    return Document(rows, spline.closed)
+
+def _write_snapshot(path: str, document: Document, seq: int):
+    with open(path + ".tmp", "wb") as f:
+        np.savez(f, rows=np.array(document.rows, dtype=np.float64).reshape(-1, 8), closed=document.closed, seq=seq)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+def _read_snapshot(path: str) -> tuple[Document, int]:
+    if not os.path.exists(path):
+        return Document(), 0
+    with np.load(path) as snapshot:
+        return Document(snapshot["rows"].tolist(), bool(snapshot["closed"])), int(snapshot["seq"])
@@ -14,6 +14,7 @@ class Node(Point):
         # chain
         self._previous: Node | None = None
         self._next: Node | None = None
+        self._index_entry = None # where the node is in its spline's OrderIndex
         
         # Node control points
         self.control_previous = ControlPoint(self)
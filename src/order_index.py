@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import random
+from typing import Any, Iterable
+
+class _Entry:
+    __slots__ = ("value", "priority", "size", "left", "right", "parent")
+
+    def __init__(self, value, priority: float):
+        self.value = value
+        self.priority = priority
+        self.size = 1
+        self.left: _Entry | None = None
+        self.right: _Entry | None = None
+        self.parent: _Entry | None = None
+
+class OrderIndex:
+    """
+    A sequence with O(log n) access by position, insertion, removal and position lookup.
+
+    It's an implicit treap: a randomly balanced binary tree ordered by position where every entry knows the size
+    of its subtree. Entries also know their parent so the position of a value can be found from its entry, which
+    is what insert/append return.
+    """
+    def __init__(self, values: Iterable[Any]=()):
+        self._root: _Entry | None = None
+        self.extend(values)
+
+    def __len__(self):
+        return _size(self._root)
+
+    def __getitem__(self, k: int):
+        return self._entry_at(k).value
+
+    def __iter__(self):
+        stack, entry = [], self._root
+        while stack or entry:
+            while entry:
+                stack.append(entry)
+                entry = entry.left
+            entry = stack.pop()
+            yield entry.value
+            entry = entry.right
+
+    def insert(self, k: int, value) -> _Entry:
+        """Inserts a value so it ends up at position k. Returns its entry."""
+        if not 0 <= k <= len(self):
+            raise IndexError("index out of range")
+
+        entry = _Entry(value, random.random())
+        left, right = _split(self._root, k)
+        self._set_root(_merge(_merge(left, entry), right))
+        return entry
+
+    def append(self, value) -> _Entry:
+        return self.insert(len(self), value)
+
+    def extend(self, values: Iterable[Any]) -> list[_Entry]:
+        """Appends many values in O(n + log n), building their tree in one go. Returns their entries."""
+        entries = [_Entry(v, random.random()) for v in values]
+        if entries:
+            self._set_root(_merge(self._root, _build(entries)))
+        return entries
+
+    def pop(self, k: int):
+        """Removes the value at position k and returns it."""
+        if not 0 <= k < len(self):
+            raise IndexError("index out of range")
+
+        left, rest = _split(self._root, k)
+        entry, right = _split(rest, 1)
+        self._set_root(_merge(left, right))
+        return entry.value
+
+    def index(self, entry: _Entry) -> int:
+        """The position of the value stored in an entry."""
+        position = _size(entry.left)
+        while entry.parent is not None:
+            if entry is entry.parent.right:
+                position += _size(entry.parent.left) + 1
+            entry = entry.parent
+        return position
+
+    def clear(self):
+        self._root = None
+
+    def _entry_at(self, k: int) -> _Entry:
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError("index out of range")
+
+        entry = self._root
+        while True:
+            left = _size(entry.left)
+            if k < left:
+                entry = entry.left
+            elif k == left:
+                return entry
+            else:
+                k -= left + 1
+                entry = entry.right
+
+    def _set_root(self, root: _Entry | None):
+        if root is not None:
+            root.parent = None
+        self._root = root
+
+def _size(entry: _Entry | None) -> int:
+    return entry.size if entry is not None else 0
+
+def _update(entry: _Entry):
+    entry.size = 1 + _size(entry.left) + _size(entry.right)
+
+def _split(entry: _Entry | None, k: int) -> tuple[_Entry | None, _Entry | None]:
+    """Splits a tree into its first k entries and the rest. The returned roots' parents are stale."""
+    if entry is None:
+        return None, None
+
+    if _size(entry.left) >= k:
+        left, right = _split(entry.left, k)
+        entry.left = right
+        if right is not None:
+            right.parent = entry
+        _update(entry)
+        return left, entry
+
+    left, right = _split(entry.right, k - _size(entry.left) - 1)
+    entry.right = left
+    if left is not None:
+        left.parent = entry
+    _update(entry)
+    return entry, right
+
+def _merge(a: _Entry | None, b: _Entry | None) -> _Entry | None:
+    """Concatenates two trees. The returned root's parent is stale."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+
+    if a.priority > b.priority:
+        a.right = _merge(a.right, b)
+        a.right.parent = a
+        _update(a)
+        return a
+
+    b.left = _merge(a, b.left)
+    b.left.parent = b
+    _update(b)
+    return b
+
+def _build(entries: list[_Entry]) -> _Entry:
+    """Builds the treap of entries already in order in O(n), the usual stack based cartesian tree construction."""
+    stack: list[_Entry] = []
+    for entry in entries:
+        last = None
+        while stack and stack[-1].priority < entry.priority:
+            last = stack.pop()
+        entry.left = last
+        if last is not None:
+            last.parent = entry
+        if stack:
+            stack[-1].right = entry
+            entry.parent = stack[-1]
+        stack.append(entry)
+
+    # sizes, children before parents
+    order, pending = [], [stack[0]]
+    while pending:
+        entry = pending.pop()
+        order.append(entry)
+        pending += [child for child in (entry.left, entry.right) if child is not None]
+    for entry in reversed(order):
+        _update(entry)
+    return stack[0]
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from math import cos, sin
+
+import numpy as np
+
+from engine import PointBuffer
+
+from .control_point import ControlPoint
+from .node import Node
+from .spline import Spline
+
+class Selection:
+    """
+    A group of nodes and control points that are transformed together.
+
+    Positions are captured into arrays when a gesture begins and every transform of the gesture is applied
+    to those arrays in one go, relative to where the gesture started. The nodes themselves are only written
+    when the gesture ends (or on write()), meanwhile the transformed arrays can be copied straight into the
+    frame buffers, see FrameBuffers.write_nodes, so a mouse move costs a few array operations however big
+    the selection is.
+
+    Control points whose node is selected simply follow it. Control points selected on their own are
+    transformed in absolute coordinates and their partner is mirrored, like when they're dragged. If both
+    control points of a node are selected on their own, the next one wins.
+    """
+    def __init__(self, nodes: list[Node], control_points: list[ControlPoint]=()):
+        self.nodes = list(nodes)
+        self._node_ids = set(map(id, self.nodes))
+        self.control_points = [c for c in control_points if id(c.parent) not in self._node_ids]
+        self._control_ids = set(map(id, self.control_points))
+
+        # everything a transform changes: the selected nodes, then the nodes of the lone control points
+        parents = {id(c.parent): c.parent for c in self.control_points}
+        self.affected = self.nodes + list(parents.values())
+        row_of = {id(n): i for i, n in enumerate(self.affected)}
+        self._control_rows = np.array([row_of[id(c.parent)] for c in self.control_points], dtype=np.intp)
+        self._is_next = np.array([c is c.parent.control_next for c in self.control_points], dtype=bool)
+
+        self.highlight = PointBuffer(len(self.nodes) + len(self.control_points))
+        self.begin()
+
+    @staticmethod
+    def from_box(spline: Spline, x0: float, y0: float, x1: float, y1: float) -> Selection | None:
+        """Selects every node and control point of the spline inside the box. Returns None if the box is empty."""
+        nodes = spline.get_nodes()
+        if not nodes:
+            return None
+
+        low = np.array((min(x0, x1), min(y0, y1)))
+        high = np.array((max(x0, x1), max(y0, y1)))
+
+        positions = np.array([(n._x, n._y) for n in nodes], dtype=np.float64)
+        inside = np.all((positions >= low) & (positions <= high), axis=1)
+        selected_nodes = [nodes[i] for i in np.flatnonzero(inside)]
+
+        controls = [c for n in nodes for c in (n.control_previous, n.control_next)]
+        offsets = np.array([(c._x, c._y) for c in controls], dtype=np.float64)
+        enabled = np.fromiter((c._enabled for c in controls), dtype=bool, count=len(controls))
+        absolute = np.repeat(positions, 2, axis=0) + offsets
+        inside = enabled & np.all((absolute >= low) & (absolute <= high), axis=1)
+        selected_controls = [controls[i] for i in np.flatnonzero(inside)]
+
+        if not selected_nodes and not selected_controls:
+            return None
+        return Selection(selected_nodes, selected_controls)
+
+    def __contains__(self, point) -> bool:
+        if isinstance(point, ControlPoint):
+            return id(point) in self._control_ids or id(point.parent) in self._node_ids
+        return id(point) in self._node_ids
+
+    def __len__(self):
+        return len(self.nodes) + len(self.control_points)
+
+    def begin(self):
+        """
+        Captures the current positions, every transform until the next begin() is relative to them.
+        Call it when a gesture starts, the spline may have been edited since the last one.
+        """
+        nodes = self.affected
+        self._positions = np.array([(n._x, n._y) for n in nodes], dtype=np.float64).reshape(-1, 2)
+        self._previous = np.array([(n.control_previous._x, n.control_previous._y) for n in nodes], dtype=np.float64).reshape(-1, 2)
+        self._next = np.array([(n.control_next._x, n.control_next._y) for n in nodes], dtype=np.float64).reshape(-1, 2)
+
+        controls = self.control_points
+        self._controls = np.array([(c._x, c._y) for c in controls], dtype=np.float64).reshape(-1, 2)
+        self._controls += self._positions[self._control_rows]
+
+        self._current = (self._positions, self._previous, self._next, self._controls)
+        self._written = True # do the nodes hold the current arrays?
+        self.last_transform = None # (matrix, offset, origin) of the last apply since begin()
+        self._update_highlight()
+
+    @property
+    def centroid(self) -> np.ndarray:
+        positions, _, _, controls = self._current
+        return np.concatenate((positions[:len(self.nodes)], controls)).mean(axis=0)
+
+    def translate(self, dx: float, dy: float):
+        self.apply(np.identity(2), (dx, dy))
+
+    def scale(self, factor: float, origin=None):
+        self.apply(np.identity(2) * factor, origin=origin)
+
+    def rotate(self, angle: float, origin=None):
+        """Rotates counter clockwise by angle radians."""
+        c, s = cos(angle), sin(angle)
+        self.apply(np.array(((c, -s), (s, c))), origin=origin)
+
+    def apply(self, matrix, offset=(0, 0), origin=None):
+        """
+        Applies p -> matrix @ (p - origin) + origin + offset to the positions captured by begin().
+        The nodes aren't written, see write().
+
+        Args:
+            matrix (array like): 2x2 linear part.
+            offset (array like, optional): Translation. Defaults to (0, 0).
+            origin (array like, optional): Fixed point of the linear part. Defaults to the centroid captured by begin().
+        """
+        matrix = np.asarray(matrix, dtype=np.float64).T
+        offset = np.asarray(offset, dtype=np.float64)
+        origin = self._begin_centroid() if origin is None else np.asarray(origin, dtype=np.float64)
+
+        self.last_transform = (matrix.T, offset, origin)
+
+        k = len(self.nodes)
+        positions, previous, next = self._positions.copy(), self._previous.copy(), self._next.copy()
+        positions[:k] = (positions[:k] - origin) @ matrix + origin + offset
+        previous[:k] = previous[:k] @ matrix # offsets are vectors, they only take the linear part
+        next[:k] = next[:k] @ matrix
+
+        # lone control points move in absolute coordinates, their node stays and their pair mirrors them
+        controls = (self._controls - origin) @ matrix + origin + offset
+        relative = controls - positions[self._control_rows]
+        rows, is_next = self._control_rows, self._is_next
+        previous[rows[~is_next]], next[rows[~is_next]] = relative[~is_next], -relative[~is_next]
+        next[rows[is_next]], previous[rows[is_next]] = relative[is_next], -relative[is_next]
+
+        self._current = (positions, previous, next, controls)
+        self._written = False
+        self._update_highlight()
+
+    def affected_values(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The (count, 2) positions and previous and next control point offsets of the affected nodes, as transformed."""
+        return self._current[:3]
+
+    def write(self):
+        """Writes the transformed positions into the nodes and control points, skipping the per point setters."""
+        if self._written:
+            return
+        positions, previous, next, _ = self._current
+        for node, (x, y), (px, py), (nx, ny) in zip(self.affected, positions.tolist(), previous.tolist(), next.tolist()):
+            node._x, node._y = x, y
+            node.control_previous._x, node.control_previous._y = px, py
+            node.control_next._x, node.control_next._y = nx, ny
+        self._written = True
+
+    def end_gesture(self):
+        """
+        Writes the gesture's result into the nodes and starts over from there.
+        Read last_transform before calling this to know the gesture's overall transform.
+        """
+        self.write()
+        self.begin()
+
+    def _begin_centroid(self) -> np.ndarray:
+        return np.concatenate((self._positions[:len(self.nodes)], self._controls)).mean(axis=0)
+
+    def _update_highlight(self):
+        positions, _, _, controls = self._current
+        positions = positions[:len(self.nodes)]
+        count = len(positions) + len(controls)
+        self.highlight.reserve(count)
+        self.highlight.data[:len(positions)] = positions
+        self.highlight.data[len(positions):count] = controls
+        self.highlight.count = count
@@ -0,0 +1,242 @@
+"""
+C2 auto-smoothing.
+
+Picks the control points of every segment so the curve through the nodes is C2 continuous, the classic
+"smooth bezier spline" construction. With P1[i] the first control point of segment i (its start node's next
+control point) the conditions reduce to a tridiagonal system:
+
+    2 P1[0]          +   P1[1]   = K[0] + 2 K[1]             (natural start, open paths only)
+      P1[i - 1] + 4 P1[i] + P1[i + 1] = 4 K[i] + 2 K[i + 1]
+    2 P1[m - 2] + 7 P1[m - 1]         = 8 K[m - 1] + K[m]     (natural end, open paths only)
+
+The second control points follow from the pairing of the node's control points (P2[i] = 2 K[i + 1] - P1[i + 1])
+except at the end of an open path where P2[m - 1] = (K[m] + P1[m - 1]) / 2. Closed paths make the system cyclic.
+
+The influence of a node on the solution decays by a factor of about 3.7 per node, so after dragging a single node
+only a window around it has to be solved again, with the control points just outside the window kept as they are.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from .node import Node
+from .spline import Spline
+
+WINDOW_RADIUS = 32 # 3.7 ** -32 is well below double precision
+_EPSILON = np.finfo(np.float64).eps
+
+def solve_window(knots, before=None, after=None, starts_open: bool=False, ends_open: bool=False) -> np.ndarray:
+    """
+    Solves the first control points of consecutive segments.
+
+    Args:
+        knots (array like): The (s + 1, 2) nodes the s segments go through.
+        before (array like, optional): The fixed first control point of the segment before the window.
+        after (array like, optional): The fixed first control point of the segment after the window.
+        starts_open (bool, optional): The first segment starts an open path, use the natural start condition.
+        ends_open (bool, optional): The last segment ends an open path, use the natural end condition.
+
+    Returns:
+        np.ndarray: The (s, 2) first control points.
+    """
+    knots = np.asarray(knots, dtype=np.float64)
+    s = len(knots) - 1
+    if s == 1 and starts_open and ends_open:
+        return ((2 * knots[0] + knots[1]) / 3)[None] # a single segment is a straight line
+
+    lower = np.ones(s)
+    diagonal = np.full(s, 4.0)
+    upper = np.ones(s)
+    rhs = 4 * knots[:-1] + 2 * knots[1:]
+
+    if starts_open:
+        lower[0], diagonal[0], upper[0] = 0, 2, 1
+        rhs[0] = knots[0] + 2 * knots[1]
+    elif before is not None:
+        rhs[0] -= before
+
+    if ends_open:
+        lower[-1], diagonal[-1], upper[-1] = 2, 7, 0
+        rhs[-1] = 8 * knots[-2] + knots[-1]
+    elif after is not None:
+        rhs[-1] -= after
+
+    lower[0] = upper[-1] = 0
+    return _thomas(lower, diagonal, upper, rhs)
+
+def solve_closed(knots) -> np.ndarray:
+    """Solves the first control points of every segment of a closed path through the (n, 2) knots, n >= 2."""
+    knots = np.asarray(knots, dtype=np.float64)
+    n = len(knots)
+    rhs = 4 * knots + 2 * np.roll(knots, -1, axis=0)
+
+    if n < 3:
+        matrix = np.array(((4.0, 2.0), (2.0, 4.0)))
+        return np.linalg.solve(matrix, rhs)
+
+    # cyclic tridiagonal, Sherman-Morrison on top of two plain solves
+    gamma = -4.0
+    lower = np.ones(n)
+    diagonal = np.full(n, 4.0)
+    upper = np.ones(n)
+    lower[0] = upper[-1] = 0
+    diagonal[0] -= gamma
+    diagonal[-1] -= 1 / gamma
+
+    x = _thomas(lower, diagonal, upper, rhs)
+    u = np.zeros((n, 1))
+    u[0], u[-1] = gamma, 1
+    z = _thomas(lower, diagonal, upper, u)
+
+    factor = (x[0] + x[-1] / gamma) / (1 + z[0, 0] + z[-1, 0] / gamma)
+    return x - z * factor
+
+def _thomas(lower, diagonal, upper, rhs) -> np.ndarray:
+    """
+    Solves a tridiagonal system with (n, k) right hand sides, vectorized.
+
+    Both sweeps of the Thomas algorithm are first order recurrences, solved as prefix scans by recursive doubling
+    (see _linear_scan). For the diagonally dominant systems of the smoothing every row's dependence on the one
+    before shrinks by a factor of 4 or more, so a handful of doublings reach double precision and the scans
+    stop there: O(n) array operations instead of a Python loop over the rows.
+    """
+    lower = np.asarray(lower, dtype=np.float64)
+    diagonal = np.asarray(diagonal, dtype=np.float64)
+    c = _elimination_factors(lower, diagonal, np.asarray(upper, dtype=np.float64))
+
+    # forward: d[i] = (rhs[i] - lower[i] d[i - 1]) / (diagonal[i] - lower[i] c[i - 1])
+    inverse = 1 / (diagonal - lower * np.concatenate(([0.0], c[:-1])))
+    d = _linear_scan(-lower * inverse, rhs * inverse[:, None])
+    # back: x[i] = d[i] - c[i] x[i + 1]
+    return _linear_scan(-c[::-1], d[::-1])[::-1]
+
+def _elimination_factors(lower: np.ndarray, diagonal: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """
+    The Thomas algorithm's c[i] = upper[i] / (diagonal[i] - lower[i] c[i - 1]).
+
+    As a fraction p / q, (p, q) goes to m[i] (p, q) with m[i] = [[0, upper[i]], [-lower[i], diagonal[i]]], so c[i]
+    comes from the product m[i] ... m[0] (0, 1). The products are built by recursive doubling, each step composing
+    every matrix with the one 2^k rows before it, until the factors stop changing.
+    """
+    n = len(diagonal)
+    m00, m01, m10, m11 = np.zeros(n), upper.copy(), -lower, diagonal.copy()
+    c = m01 / m11
+    step = 1
+    while step < n:
+        a00, a01, a10, a11 = m00[step:], m01[step:], m10[step:], m11[step:]
+        b00, b01, b10, b11 = m00[:-step], m01[:-step], m10[:-step], m11[:-step]
+        p00, p01 = a00 * b00 + a01 * b10, a00 * b01 + a01 * b11
+        p10, p11 = a10 * b00 + a11 * b10, a10 * b01 + a11 * b11
+        scale = 1 / np.abs(p11) # only the ratios matter, keep the products from over or underflowing
+        m00[step:], m01[step:], m10[step:], m11[step:] = p00 * scale, p01 * scale, p10 * scale, p11 * scale
+        step *= 2
+
+        previous, c = c, m01 / m11
+        if np.abs(c - previous).max() <= 4 * _EPSILON * np.abs(c).max():
+            break
+    return c
+
+def _linear_scan(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Solves x[i] = a[i] x[i - 1] + b[i] with x[-1] = 0 for (n,) a and (n, k) b. After doubling step s, b[i] holds
+    x[i] minus a[i] ... a[i - s + 1] x[i - s], which a[i] holds, so once every |a| is negligible b is x.
+    """
+    a, b = a.copy(), b.copy()
+    step = 1
+    while step < len(a):
+        b[step:] += a[step:, None] * b[:-step]
+        a[step:] *= a[:-step]
+        step *= 2
+        if np.abs(a[step:]).max(initial=0) < _EPSILON:
+            break
+    return b
+
+def smooth_offsets(knots, closed: bool) -> np.ndarray:
+    """
+    The offsets of the next control points of every node of a path through the (n, 2) knots, n >= 2, that make it
+    C2 continuous. The previous control points mirror them. The journal replays auto-smoothing with this too.
+    """
+    knots = np.asarray(knots, dtype=np.float64)
+    if closed:
+        return solve_closed(knots) - knots
+    return _offsets(knots, solve_window(knots, starts_open=True, ends_open=True), ends_open=True)
+
+def auto_smooth(spline: Spline) -> list[Node]:
+    """Sets every control point of the spline so the curve is C2 continuous. Returns the nodes in order."""
+    nodes = spline.get_nodes()
+    if len(nodes) < 2:
+        return nodes
+
+    knots = np.array([(n._x, n._y) for n in nodes], dtype=np.float64)
+    _write(nodes, smooth_offsets(knots, spline.closed))
+    return nodes
+
+def auto_smooth_around(spline: Spline, node: Node, radius: int=WINDOW_RADIUS) -> list[Node]:
+    """
+    Re-solves the control points near a node that moved, leaving the rest of the spline as it is.
+    Only O(radius) work no matter how long the spline is.
+
+    Returns:
+        list[Node]: The consecutive nodes whose control points were changed, the node is one of them.
+    """
+    segment_count = len(spline) if spline.closed else len(spline) - 1
+    if segment_count < 1:
+        return []
+    if 2 * radius + 2 >= segment_count:
+        return auto_smooth(spline)
+
+    def step(n, forward):
+        n = n.next if forward else n.previous
+        if n is None and spline.closed:
+            n = spline.start if forward else spline.end
+        return n
+
+    # the segments starting at the nodes within radius of the node
+    first = node
+    for _ in range(radius):
+        if step(first, False) is None:
+            break
+        first = step(first, False)
+
+    starts = [first]
+    for _ in range(2 * radius):
+        n = step(starts[-1], True)
+        if n is None or step(n, True) is None:
+            break
+        starts.append(n)
+    window = starts + [step(starts[-1], True)]
+
+    before = step(first, False)
+    after = window[-1] if step(window[-1], True) is not None else None
+    knots = np.array([(n._x, n._y) for n in window], dtype=np.float64)
+
+    first_controls = solve_window(
+        knots,
+        before=None if before is None else _first_control(before),
+        after=None if after is None else _first_control(after),
+        starts_open=before is None,
+        ends_open=after is None
+    )
+    changed = window if after is None else starts
+    _write(changed, _offsets(knots, first_controls, ends_open=after is None))
+    return changed
+
+def _first_control(node: Node) -> tuple[float, float]:
+    return node._x + node.control_next._x, node._y + node.control_next._y
+
+def _offsets(knots: np.ndarray, first_controls: np.ndarray, ends_open: bool=False) -> np.ndarray:
+    """
+    Turns the solved first control points of the segments through the knots into next control point offsets of
+    the segments' start nodes, and of the last knot too if it ends an open path.
+    """
+    offsets = first_controls - knots[:len(first_controls)]
+    # the last node of an open path only has its previous control point, halfway to the last first control point
+    if ends_open:
+        offsets = np.concatenate((offsets, (knots[-1:] - first_controls[-1:]) / 2))
+    return offsets
+
+def _write(nodes: list[Node], offsets: np.ndarray):
+    """Sets the nodes' next control points to the offsets, their previous control points mirror them."""
+    for node, (dx, dy) in zip(nodes, offsets.tolist()):
+        node.control_next._x, node.control_next._y = dx, dy
+        node.control_previous._x, node.control_previous._y = -dx, -dy
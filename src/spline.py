@@ -1,16 +1,28 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
 from engine import Point
+from engine.curves import evaluate_bezier, split_bezier
+from .derivatives import SplineDerivatives
 from .node import Node
+from .order_index import OrderIndex
 
 class Spline:
     """
     Represents a spline.
     Basically just a doubly linked list.
+    The nodes are also kept in an OrderIndex so the node at a position, and the position of a node, are found in
+    O(log n) without walking the list. Segment k goes from node k to node k + 1.
+    A closed spline has one more segment going from the end back to the start, using the end's next
+    control point and the start's previous one. The list itself stays open, iterating still goes from start to end.
     """
     def __init__(self):
         self.start: Node | None = None
         self.end: Node | None = None
+        self.closed = False
 
         self._length = 0
+        self._index = OrderIndex()
     
     def is_empty(self):
         return self._length == 0
@@ -23,7 +35,9 @@ class Spline:
             self.start.previous = node  # Link current head to new node
             self.start = node  # Update head
 
+        node._index_entry = self._index.insert(0, node)
         self._length += 1
+        self._update_closure()
 
     def push_back(self, node: Node):
         if self.end is None:
@@ -33,7 +47,9 @@ class Spline:
             self.end.next = node  # Link current tail to new node
             self.end = node  # Update tail
         
+        node._index_entry = self._index.append(node)
         self._length += 1
+        self._update_closure()
 
     def pop_front(self):
         if self.start is None:
@@ -46,7 +62,10 @@ class Spline:
             self.start = self.start.next  # Move head forward
             self.start.previous = None  # Remove reference to old head
 
+        self._index.pop(0)
+        data._index_entry = None
         self._length -= 1
+        self._update_closure()
 
         return data
 
@@ -60,31 +79,209 @@ class Spline:
         else:
             self.end = self.end.previous  # Move tail backward
             self.end.next = None  # Remove reference to old tail
+
+        self._index.pop(self._length - 1)
+        data._index_entry = None
         self._length -= 1
+        self._update_closure()
 
         return data
 
-    def push_nearest(self, node: Node):
+    def extend(self, nodes: list[Node]):
+        """Pushes many nodes to the back at once, indexing them in one go."""
+        for node in nodes:
+            if self.end is None:
+                self.start = node
+            else:
+                node.previous = self.end
+                self.end.next = node
+            self.end = node
+
+        for node, entry in zip(nodes, self._index.extend(nodes)):
+            node._index_entry = entry
+        self._length += len(nodes)
+        self._update_closure()
+
+    def node_at(self, k: int) -> Node:
+        """The node at position k, negative positions count from the end."""
+        return self._index[k]
+
+    def index_of(self, node: Node) -> int:
+        """The position of a node in the spline."""
+        if node._index_entry is None:
+            raise ValueError("node is not in a spline")
+        return self._index.index(node._index_entry)
+
+    def insert(self, k: int, node: Node):
+        """Inserts a node so it ends up at position k, linking it between its neighbours."""
+        if k == 0:
+            return self.push_front(node)
+        if k == self._length:
+            return self.push_back(node)
+
+        previous = self._index[k - 1]
+        next = previous.next
+        node.previous, node.next = previous, next
+        previous.next = next.previous = node
+
+        node._index_entry = self._index.insert(k, node)
+        self._length += 1
+        self._update_closure()
+
+    def remove(self, k: int) -> Node:
+        """Unlinks the node at position k and returns it. Its neighbours get linked to each other."""
+        if k < 0:
+            k += self._length
+        if k == 0:
+            return self.pop_front()
+        if k == self._length - 1:
+            return self.pop_back()
+
+        node = self._index.pop(k)
+        node.previous.next = node.next
+        node.next.previous = node.previous
+        node.previous = node.next = None
+        node._index_entry = None
+        self._length -= 1
+        self._update_closure()
+        return node
+
+    def segment_count(self) -> int:
+        if self._length < 2:
+            return 0
+        return self._length if self.closed else self._length - 1
+
+    def segment(self, k: int) -> np.ndarray:
+        """The (4, 2) control points of segment k, the closing segment being the last one of a closed path."""
+        if not 0 <= k < self.segment_count():
+            raise IndexError("segment index out of range")
+
+        a = self._index[k]
+        b = a.next if a.next is not None else self.start
+        return np.array((
+            (a._x, a._y),
+            (a._x + a.control_next._x, a._y + a.control_next._y),
+            (b._x + b.control_previous._x, b._y + b.control_previous._y),
+            (b._x, b._y)
+        ), dtype=np.float64)
+
+    def split_segment(self, k: int, t: float) -> Node:
+        """
+        Inserts a node on segment k at parameter t without changing the shape of the curve.
+
+        Both halves come from de Casteljau so the curve is preserved exactly, which means the control points
+        around the new node are colinear but not the same length, and the ones facing it on the neighbours
+        are shortened. The pairs only go back to being mirrored once one of their points is dragged.
+
+        Returns:
+            Node: The new node, at position k + 1.
+        """
+        left, right = split_bezier(self.segment(k), t)
+        a = self._index[k]
+        b = a.next if a.next is not None else self.start
+
+        node = Node(*left[3])
+        self.insert(k + 1, node)
+
+        _set_offset(a.control_next, left[1] - left[0])
+        _set_offset(node.control_previous, left[2] - left[3])
+        _set_offset(node.control_next, right[1] - right[0])
+        _set_offset(b.control_previous, right[2] - right[3])
+        return node
+
+    def nearest_on_curve(self, x: float, y: float, resolution: int=32) -> tuple[int, float, float] | None:
+        """
+        Finds the point of the curve nearest to (x, y), sampling every segment resolution + 1 times.
+
+        Returns:
+            tuple[int, float, float] | None: (segment, t, distance), None if there are no segments.
+        """
+        segments = self.segment_control_points()
+        if len(segments) == 0:
+            return None
+
+        samples = evaluate_bezier(segments, resolution)
+        distances = np.hypot(samples[..., 0] - x, samples[..., 1] - y)
+        segment, i = np.unravel_index(np.argmin(distances), distances.shape)
+        return int(segment), i / resolution, float(distances[segment, i])
+
+    def delete_node(self, k: int) -> Node:
+        """
+        Removes the node at position k, merging the two segments around it into one.
+
+        The merged segment keeps the ends and the tangent directions there. It's the segment that would split
+        back into the two old ones if they came from a split, the split parameter being estimated from the
+        lengths of the removed node's control points. The end nodes of an open path just get popped.
+
+        Returns:
+            Node: The removed node.
+        """
+        if k < 0:
+            k += self._length
+        node = self._index[k]
+        previous, next = self.neighbours(node)
+        if previous is None or next is None or previous is next:
+            return self.remove(k)
+
+        before = np.array((previous.control_next._x, previous.control_next._y))
+        after = np.array((next.control_previous._x, next.control_previous._y))
+
+        incoming = np.hypot(node.control_previous._x, node.control_previous._y)
+        outgoing = np.hypot(node.control_next._x, node.control_next._y)
+        t = incoming / (incoming + outgoing) if incoming + outgoing > 0 else 0.5
+        t = min(max(t, 1e-3), 1 - 1e-3)
+
+        self.remove(k)
+        _set_offset(previous.control_next, before / t)
+        _set_offset(next.control_previous, after / (1 - t))
+        return node
+
+    def set_closed(self, closed: bool):
+        """Opens or closes the path. The closing segment needs at least 2 nodes to show up."""
+        self.closed = closed
+        if not closed and self._length > 1:
+            self.end.control_next._enabled = False
+            self.start.control_previous._enabled = False
+        self._update_closure()
+
+    def _update_closure(self):
+        # linking and unlinking turns the control points of the closing segment off, turn them back on
+        if self.closed and self._length > 1:
+            self.end.control_next._enabled = True
+            self.start.control_previous._enabled = True
+
+    def neighbours(self, node: Node) -> tuple[Node | None, Node | None]:
+        """The nodes before and after a node, wrapping around if the path is closed."""
+        previous, next = node.previous, node.next
+        if self.closed and self._length > 1:
+            if previous is None:
+                previous = self.end
+            if next is None:
+                next = self.start
+        return previous, next
+
+    def push_nearest(self, node: Node) -> str:
         """
         Pushes the node either to the start or the end depending on what's nearest.
+        Returns which end it was pushed to, "front" or "back".
         """
         # if the list is empty just push, it doesn't matter
         if self.is_empty() or self.start == self.end:
             self.push_back(node)
+            return "back"
+
         # otherwise pick the closest option
-        else:
-            d_to_s = node.distance_to(self.start)
-            d_to_e = node.distance_to(self.end)
-
-            # if the start is closer
-            if d_to_s < d_to_e:
-                self.push_front(node)
-            # if the end is closer
-            elif d_to_e < d_to_s:
-                self.push_back(node)
-            # if they're the same
-            else:
-                self.push_back(node) # doesn't matter, just pick one
+        d_to_s = node.distance_to(self.start)
+        d_to_e = node.distance_to(self.end)
+
+        # if the start is closer
+        if d_to_s < d_to_e:
+            self.push_front(node)
+            return "front"
+
+        # if the end is closer or they're the same (doesn't matter, just pick one)
+        self.push_back(node)
+        return "back"
     
     def unwrap_nodes_abs(self) -> list[Point]:
         """
@@ -146,6 +343,45 @@ class Spline:
             out += node.get_abs_control_points()
         return out
     
+    def control_polygon(self) -> np.ndarray:
+        """
+        Returns the nodes and control points in order and in absolute coordinates, as a (count, 2) array.
+        Every 4 consecutive points starting at 0, 3, 6... are the control points of a segment of the spline.
+        A closed spline starts with the start node and ends with it again, after the closing segment.
+        """
+        closed = self.closed and self._length > 1
+        out = []
+        for node in self:
+            x, y = node._x, node._y
+            if node.control_previous._enabled and not (closed and node is self.start):
+                out.append((x + node.control_previous._x, y + node.control_previous._y))
+            out.append((x, y))
+            if node.control_next._enabled:
+                out.append((x + node.control_next._x, y + node.control_next._y))
+
+        if closed:
+            start = self.start
+            out.append((start._x + start.control_previous._x, start._y + start.control_previous._y))
+            out.append((start._x, start._y))
+        return np.array(out, dtype=np.float64).reshape(-1, 2)
+
+    def segment_control_points(self) -> np.ndarray:
+        """Returns the control points of every segment as a (segment_count, 4, 2) array."""
+        polygon = self.control_polygon()
+        segment_count = max((len(polygon) - 1) // 3, 0)
+        if segment_count == 0:
+            return np.empty((0, 4, 2))
+
+        windows = sliding_window_view(polygon, 4, axis=0)[::3].swapaxes(1, 2)
+        return np.ascontiguousarray(windows[:segment_count])
+
+    def derivatives(self) -> SplineDerivatives:
+        """
+        Precomputes the hodographs of every segment for tangent, normal and curvature queries.
+        The result is a snapshot, call this again after the spline changes.
+        """
+        return SplineDerivatives(self.segment_control_points(), self.closed and self._length > 1)
+
     def __iter__(self):
         """An iterator over the spline"""
         current = self.start
@@ -155,3 +391,7 @@ class Spline:
     
     def __len__(self):
         return self._length
+
+def _set_offset(control_point, offset):
+    # writes a control point without mirroring its pair
+    control_point._x, control_point._y = float(offset[0]), float(offset[1])
@@ -0,0 +1,109 @@
+import threading
+
+from engine import PointBuffer
+from engine.curves import tessellate_bezier_chain
+
+class TessellationWorker:
+    """
+    Tessellates the spline on a background thread so the render thread never waits on it.
+
+    The render thread submits snapshots of the bezier chain and keeps drawing the front buffer
+    while the worker writes the newest snapshot into the back buffer. Once the back buffer is done
+    it gets swapped with the front one the next time the render thread asks for it, so a buffer is
+    never written while it's being drawn. Snapshots that arrive while the worker is busy replace
+    each other, only the latest one gets tessellated.
+    """
+    def __init__(self, num_segments: int=200):
+        self.num_segments = num_segments
+
+        self._front = PointBuffer()
+        self._back = PointBuffer()
+        self._snapshot = PointBuffer() # latest submitted control points
+        self._work = PointBuffer() # control points the worker is tessellating
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending = False # is there a snapshot waiting to be tessellated?
+        self._ready = False # does the back buffer hold finished geometry?
+        self._running = True
+
+        # snapshots are numbered so the render thread can tell which one the front buffer holds
+        self._submitted = 0
+        self._work_generation = 0
+        self._back_generation = 0
+        self._front_generation = 0
+
+        self._thread = threading.Thread(target=self._run, name="tessellation", daemon=True)
+        self._thread.start()
+
+    @property
+    def strip_length(self) -> int:
+        """How many points each curve of the front buffer has."""
+        return self.num_segments + 1
+
+    @property
+    def front_generation(self) -> int:
+        """The number submit() returned for the snapshot the front buffer holds, 0 before the first one arrives."""
+        return self._front_generation
+
+    def submit(self, controls: PointBuffer) -> int:
+        """
+        Hands a copy of the bezier chain to the worker. Call from the render thread.
+
+        Returns:
+            int: The snapshot's number, see front_generation.
+        """
+        with self._lock:
+            self._snapshot.reserve(controls.count)
+            self._snapshot.data[:controls.count] = controls.data[:controls.count]
+            self._snapshot.count = controls.count
+            self._pending = True
+            self._submitted += 1
+            self._wakeup.notify()
+            return self._submitted
+
+    def front(self) -> PointBuffer:
+        """
+        Returns the latest finished geometry, swapping the buffers first if the worker finished a new one.
+        Call from the render thread, the returned buffer is only valid until the next call.
+        """
+        with self._lock:
+            if self._ready:
+                self._front, self._back = self._back, self._front
+                self._front_generation = self._back_generation
+                self._ready = False
+                self._wakeup.notify()
+            return self._front
+
+    def is_busy(self) -> bool:
+        """True while there is geometry that the render thread hasn't received yet."""
+        with self._lock:
+            return self._pending or self._ready or self._work.count > 0
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            self._wakeup.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                # wait for a snapshot and for the back buffer to be handed over
+                while self._running and not (self._pending and not self._ready):
+                    self._wakeup.wait()
+                if not self._running:
+                    return
+
+                self._snapshot, self._work = self._work, self._snapshot
+                self._pending = False
+                self._work_generation = self._submitted
+                back = self._back
+
+            # the back buffer is only ever touched here until _ready is set
+            tessellate_bezier_chain(self._work, back, 3, self.num_segments)
+
+            with self._lock:
+                self._work.count = 0
+                self._back_generation = self._work_generation
+                self._ready = True
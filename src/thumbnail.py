@@ -0,0 +1,148 @@
+"""
+Renders splines to images on the CPU, e.g. to make thumbnails on a server without a GL context or a display.
+The spline is drawn like in the app (the fill of closed paths, curve, handles, square nodes and round control
+points) with engine.Raster.
+"""
+import numpy as np
+
+from engine import colors
+from engine.curves import cubic_bounding_boxes, evaluate_bezier, flatten_resolution
+from engine.raster import Raster
+
+from .fill import FillCache
+from .frame import FrameBuffers
+from .spline import Spline
+
+HANDLE_COLOR = (0, 0.8, 0.6)
+FILL_COLOR = (0.85, 0.9, 1)
+MAX_FILL_RESOLUTION = 32 # the fill is triangulated in O(n^2), its outline isn't flattened finer than this
+FLATTEN_BATCH = 1 << 20 # the most curve points drawn at once
+
+def spline_bounds(spline: Spline) -> np.ndarray | None:
+    """The box (min x, min y, max x, max y) around the curve, the nodes and the control points. None if empty."""
+    if spline.is_empty():
+        return None
+
+    points = spline.control_polygon()
+    low, high = points.min(axis=0), points.max(axis=0)
+    segments = spline.segment_control_points()
+    if len(segments):
+        boxes = cubic_bounding_boxes(segments)
+        low = np.minimum(low, boxes[:, :2].min(axis=0))
+        high = np.maximum(high, boxes[:, 2:].max(axis=0))
+    return np.concatenate((low, high))
+
+def draw_spline(
+        raster: Raster,
+        spline: Spline,
+        line_width: float=2,
+        point_size: float=5,
+        handles: bool=True,
+        tolerance: float=0.25
+    ):
+    """
+    Draws a spline into a raster.
+
+    Args:
+        raster (Raster): Where to draw.
+        spline (Spline): What to draw.
+        line_width (float, optional): The curve's width in pixels. Defaults to 2.
+        point_size (float, optional): The size of the nodes in pixels, 0 to leave them and the control points out. Defaults to 5.
+        handles (bool, optional): Draw the control points and their handles. Defaults to True.
+        tolerance (float, optional): How far in pixels the flattened curve may be from the real one. Defaults to 0.25.
+    """
+    frame = FrameBuffers()
+    frame.update(spline)
+    segments = spline.segment_control_points()
+
+    # flatten in image space so the tolerance is in pixels whatever the scale
+    resolution = flatten_resolution(segments * raster.scale, tolerance)
+    draw_parts(
+        raster,
+        segments,
+        resolution,
+        frame.handles.view().reshape(-1, 2, 2),
+        frame.nodes.view(),
+        frame.control_points.view(),
+        line_width,
+        point_size,
+        handles,
+        fill_triangles(spline, frame, resolution)
+    )
+
+def fill_triangles(spline: Spline, frame: FrameBuffers, resolution: int) -> np.ndarray | None:
+    """
+    The (count, 3, 2) triangles filling a closed spline like the app fills it, None if it isn't filled.
+    frame has to hold the spline already, resolution is how many lines the outline's segments are flattened into.
+    """
+    if not spline.closed or len(spline) < 3:
+        return None
+    fill = FillCache(min(resolution, MAX_FILL_RESOLUTION))
+    return fill.update(frame.curve).view().astype(np.float64).reshape(-1, 3, 2)
+
+def draw_parts(
+        raster: Raster,
+        segments: np.ndarray,
+        resolution: int,
+        handle_lines: np.ndarray,
+        nodes: np.ndarray,
+        control_points: np.ndarray,
+        line_width: float=2,
+        point_size: float=5,
+        handles: bool=True,
+        fill: np.ndarray | None=None
+    ):
+    """
+    Draws the pieces of a spline, for when only some of them are needed (see src.export). The arguments are the
+    segments' control points (curves, 4, 2), how many lines each segment is flattened into, the handles as
+    (count, 2, 2) lines from their node to their control point, the nodes and control points and optionally the
+    (count, 3, 2) triangles of the fill (see fill_triangles). See draw_spline for the rest.
+    """
+    if fill is not None and len(fill):
+        raster.draw_triangles(fill, FILL_COLOR)
+
+    if handles and len(handle_lines):
+        raster.draw_lines(handle_lines[:, 0], handle_lines[:, 1], 1, HANDLE_COLOR)
+
+    # flattened a batch at a time so a huge spline doesn't need all of its points in memory at once
+    batch = max(FLATTEN_BATCH // (resolution + 1), 1)
+    for i in range(0, len(segments), batch):
+        raster.draw_polylines(evaluate_bezier(segments[i:i + batch], resolution), line_width, colors.BLACK)
+
+    if point_size > 0:
+        raster.draw_points(nodes, point_size, colors.BLUE)
+        if handles:
+            raster.draw_points(control_points, point_size * 0.8, colors.BLACK, round=True)
+
+def fit(bounds, width: int, height: int, margin: float=0) -> tuple[np.ndarray, float]:
+    """
+    The view that fits a box (min x, min y, max x, max y) in a width x height image, centered, with margin pixels
+    around it. The origin is the canvas point at the bottom left corner of the image, see Raster.
+
+    Returns:
+        tuple[np.ndarray, float]: The origin and scale to give to a Raster.
+    """
+    bounds = np.asarray(bounds, dtype=np.float64)
+    size = np.maximum(bounds[2:] - bounds[:2], 1e-9)
+    room = np.maximum(np.array((width, height)) - 2 * margin, 1)
+    scale = float((room / size).min())
+    center = (bounds[:2] + bounds[2:]) / 2
+    return center - np.array((width, height)) / (2 * scale), scale
+
+def render_thumbnail(spline: Spline, width: int=256, height: int=256, margin: float=8, **style) -> Raster:
+    """
+    Draws a spline scaled to fit in a width x height image, centered, with margin pixels around it.
+    The style keywords are passed to draw_spline.
+    """
+    bounds = spline_bounds(spline)
+    if bounds is None:
+        return Raster(width, height)
+
+    origin, scale = fit(bounds, width, height, margin)
+    raster = Raster(width, height, origin=origin, scale=scale)
+    draw_spline(raster, spline, **style)
+    return raster
+
+def write_thumbnail(spline: Spline, path: str, width: int=256, height: int=256, **style):
+    """Renders a thumbnail (see render_thumbnail) and writes it to a PNG file."""
+    render_thumbnail(spline, width, height, **style).write_png(path)
@@ -0,0 +1,38 @@
+import numpy as np
+
+from engine import PointBuffer
+
+def test_reserve_grows_by_doubling_and_keeps_points():
+    buffer = PointBuffer(4)
+    buffer.data[:3] = [[1, 2], [3, 4], [5, 6]]
+    buffer.count = 3
+
+    buffer.reserve(5)
+    assert buffer.capacity == 8 # doubled, not just enough
+    assert buffer.count == 3
+    assert np.array_equal(buffer.view(), [[1, 2], [3, 4], [5, 6]])
+
+    buffer.reserve(100)
+    assert buffer.capacity == 100 # more than double when asked for
+    assert np.array_equal(buffer.view(), [[1, 2], [3, 4], [5, 6]])
+
+def test_reserve_within_capacity_keeps_the_storage():
+    buffer = PointBuffer(16)
+    data = buffer.data
+    buffer.reserve(16)
+    buffer.clear()
+    buffer.reserve(1)
+    assert buffer.data is data
+    assert len(buffer) == 0
+
+def test_dtype_is_kept_when_growing():
+    buffer = PointBuffer(1, dtype=np.float64)
+    buffer.reserve(10)
+    assert buffer.data.dtype == np.float64
+
+def test_view_is_not_a_copy():
+    buffer = PointBuffer(4)
+    buffer.count = 2
+    buffer.view()[:] = 7
+    assert np.all(buffer.data[:2] == 7)
+    assert np.all(buffer.data[2:] == 0)
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from engine import curves
+from engine.curves import (
+    bernstein_matrix, bspline_basis, bspline_matrices, de_boor, de_casteljau,
+    evaluate_bezier, evaluate_bspline, uniform_bspline_matrix, uniform_knots
+)
+
+rng = np.random.default_rng(28)
+
+def cox_de_boor(knots, i, degree, t):
+    """The textbook recursive definition of the B-spline basis, as a reference."""
+    if degree == 0:
+        return 1.0 if knots[i] <= t < knots[i + 1] else 0.0
+    value = 0.0
+    if knots[i + degree] > knots[i]:
+        value += (t - knots[i]) / (knots[i + degree] - knots[i]) * cox_de_boor(knots, i, degree - 1, t)
+    if knots[i + degree + 1] > knots[i + 1]:
+        value += (knots[i + degree + 1] - t) / (knots[i + degree + 1] - knots[i + 1]) * cox_de_boor(knots, i + 1, degree - 1, t)
+    return value
+
+def reference_bspline(control_points, degree, knots, t):
+    return sum(cox_de_boor(knots, i, degree, t) * p for i, p in enumerate(control_points))
+
+def random_knots(count, degree):
+    """A non uniform knot vector with a repeated inner knot."""
+    steps = rng.uniform(0.2, 2, count + degree)
+    steps[count // 2] = 0
+    return np.concatenate(([0.0], np.cumsum(steps)))
+
+@pytest.mark.parametrize("degree", [1, 2, 3, 5])
+def test_evaluate_bezier_matches_de_casteljau(degree):
+    control_points = rng.uniform(-100, 100, (degree + 1, 2))
+    points = evaluate_bezier(control_points, resolution=16)
+    for i, t in enumerate(np.linspace(0, 1, 17)):
+        assert np.allclose(points[i], de_casteljau(control_points, t))
+
+@pytest.mark.parametrize("degree", [2, 3])
+@pytest.mark.parametrize("uniform", [True, False])
+def test_de_boor_matches_the_basis_definition(degree, uniform):
+    count = 8
+    control_points = rng.uniform(-100, 100, (count, 2))
+    knots = uniform_knots(count, degree) if uniform else random_knots(count, degree)
+
+    for t in rng.uniform(knots[degree], knots[count], 20):
+        expected = reference_bspline(control_points, degree, knots, t)
+        assert np.allclose(de_boor(control_points, t, degree, None if uniform else knots), expected)
+
+@pytest.mark.parametrize("degree", [2, 3, 4])
+def test_clamped_bspline_is_a_bezier(degree):
+    # with degree + 1 control points and clamped knots the B-spline is the bezier with the same control points
+    control_points = rng.uniform(-100, 100, (degree + 1, 2))
+    knots = uniform_knots(degree + 1, degree, clamped=True)
+
+    for t in rng.uniform(0, 1, 20):
+        assert np.allclose(de_boor(control_points, t, degree, knots), de_casteljau(control_points, t))
+
+    points = evaluate_bspline(control_points, degree, resolution=10, knots=knots)
+    assert points.shape == (1, 11, 2)
+    assert np.allclose(points[0], evaluate_bezier(control_points, resolution=10))
+
+@pytest.mark.parametrize("uniform", [True, False])
+def test_evaluate_bspline_matches_de_boor(uniform):
+    degree, count, resolution = 3, 9, 6
+    control_points = rng.uniform(-100, 100, (count, 2))
+    knots = uniform_knots(count, degree) if uniform else random_knots(count, degree)
+
+    points = evaluate_bspline(control_points, degree, resolution, None if uniform else knots)
+    spans = [s for s in range(degree, count) if knots[s] < knots[s + 1]]
+    assert points.shape == (len(spans), resolution + 1, 2)
+
+    for polyline, span in zip(points, spans):
+        for point, t in zip(polyline, np.linspace(knots[span], knots[span + 1], resolution + 1)):
+            assert np.allclose(point, de_boor(control_points, t, degree, knots))
+
+def test_basis_is_a_partition_of_unity():
+    knots = random_knots(10, 3)
+    t = rng.uniform(knots[4], knots[5], 50)
+    basis = bspline_basis(knots, 3, 4, t)
+    assert np.allclose(basis.sum(axis=1), 1)
+    assert np.all(basis >= 0)
+
+def test_bspline_matrices_are_cached():
+    knots = random_knots(7, 3)
+    spans, matrices = bspline_matrices(knots, 3, 12)
+    assert not matrices.flags.writeable and not spans.flags.writeable
+
+    # equal knots hit the cache even as a different array, different ones don't
+    again = bspline_matrices(list(knots), 3, 12)
+    assert again[0] is spans and again[1] is matrices
+    assert bspline_matrices(knots, 3, 13)[1] is not matrices
+    other = knots.copy()
+    other[-1] += 1
+    assert bspline_matrices(other, 3, 12)[1] is not matrices
+
+    size = len(curves._bspline_matrices)
+    evaluate_bspline(rng.uniform(size=(7, 2)), 3, 12, knots)
+    assert len(curves._bspline_matrices) == size
+
+def test_uniform_matrix_is_shared_by_every_span():
+    matrix = uniform_bspline_matrix(3, 8)
+    assert np.shares_memory(uniform_bspline_matrix(3, 8), matrix) # a view into the cached matrices
+    _, matrices = bspline_matrices(uniform_knots(12, 3), 3, 8)
+    assert np.allclose(matrices, matrix)
+
+def test_bernstein_matrix_is_cached_per_dtype():
+    matrix = bernstein_matrix(3, 10)
+    assert bernstein_matrix(3, 10) is matrix
+    assert not matrix.flags.writeable
+    single = bernstein_matrix(3, 10, np.float32)
+    assert single.dtype == np.float32 and single is not matrix
@@ -0,0 +1,83 @@
+from math import sqrt
+
+import numpy as np
+import pytest
+
+from src.derivatives import SplineDerivatives
+from src.node import Node
+from src.smooth import auto_smooth
+from src.spline import Spline
+
+# the usual handle length for approximating a quarter circle with a cubic
+KAPPA = 4 * (sqrt(2) - 1) / 3
+
+def circle(radius):
+    """Four cubics approximating a counter clockwise circle around the origin."""
+    segments = []
+    for quarter in range(4):
+        a, b = quarter * np.pi / 2, (quarter + 1) * np.pi / 2
+        start = radius * np.array([np.cos(a), np.sin(a)])
+        end = radius * np.array([np.cos(b), np.sin(b)])
+        start_tangent = np.array([-np.sin(a), np.cos(a)])
+        end_tangent = np.array([-np.sin(b), np.cos(b)])
+        segments.append([start, start + KAPPA * radius * start_tangent, end - KAPPA * radius * end_tangent, end])
+    return SplineDerivatives(np.array(segments), closed=True)
+
+def samples(derivatives, per_segment=16):
+    segments = np.repeat(np.arange(len(derivatives)), per_segment)
+    t = np.tile(np.linspace(0, 1, per_segment), len(derivatives))
+    return segments, t
+
+@pytest.mark.parametrize("radius", [1, 250])
+def test_circle_frames(radius):
+    derivatives = circle(radius)
+    segments, t = samples(derivatives)
+    points = derivatives.points(segments, t)
+    tangents, normals, curvature = derivatives.frames(segments, t)
+
+    radial = points / np.hypot(points[:, 0], points[:, 1])[:, None]
+    assert np.allclose(np.hypot(tangents[:, 0], tangents[:, 1]), 1)
+    assert np.allclose(np.einsum("kd,kd->k", tangents, radial), 0, atol=2e-3) # tangent to the circle
+    assert np.allclose(normals, -radial, atol=2e-3) # turning counter clockwise, so towards the center
+    assert np.allclose(curvature * radius, 1, rtol=0.025)
+
+def test_clockwise_curvature_is_negative():
+    derivatives = circle(10)
+    reversed_ = SplineDerivatives(derivatives.control_points[::-1, ::-1].copy(), closed=True)
+    _, _, curvature = reversed_.frames(*samples(reversed_))
+    assert np.all(curvature < 0)
+
+def test_straight_and_degenerate_segments():
+    derivatives = SplineDerivatives(np.array([
+        [[0, 0], [1, 1], [2, 2], [3, 3]],
+        [[5, 5], [5, 5], [5, 5], [5, 5]],
+    ], dtype=np.float64))
+    tangents, normals, curvature = derivatives.frames([0, 0, 1], [0.2, 0.7, 0.5])
+
+    assert np.allclose(tangents[:2], [1 / sqrt(2), 1 / sqrt(2)])
+    assert np.allclose(normals[:2], [-1 / sqrt(2), 1 / sqrt(2)])
+    assert np.allclose(curvature, 0)
+    # a segment that doesn't move has no direction
+    assert np.array_equal(tangents[2], [0, 0]) and np.array_equal(normals[2], [0, 0])
+
+def test_g1_includes_the_wrap_joint_of_a_closed_curve():
+    derivatives = circle(10)
+    assert derivatives.g1_continuous().tolist() == [True] * 4
+
+    # kink the curve where the last segment meets the first one
+    kinked = derivatives.control_points.copy()
+    kinked[-1, 2] += [3, 0]
+    assert SplineDerivatives(kinked, closed=True).g1_continuous().tolist() == [True, True, True, False]
+    # as an open curve that isn't a joint
+    assert SplineDerivatives(kinked).g1_continuous().tolist() == [True, True, True]
+
+@pytest.mark.parametrize("closed", [False, True])
+def test_smoothed_spline_is_g1(closed):
+    spline = Spline()
+    spline.extend([Node(100 * i, 80 * (i % 3)) for i in range(6)])
+    spline.set_closed(closed)
+    auto_smooth(spline)
+
+    continuity = spline.derivatives().g1_continuous()
+    assert len(continuity) == (6 if closed else 4)
+    assert continuity.all()
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from src.export import export_png
+from src.node import Node
+from src.smooth import auto_smooth
+from src.spline import Spline
+
+from test_png import read_png
+
+def make_spline(closed):
+    spline = Spline()
+    spline.extend([Node(40 * i, 60 * ((i * 7) % 3)) for i in range(7)])
+    spline.set_closed(closed)
+    auto_smooth(spline)
+    return spline
+
+def export(spline, path, tile_size, **kwargs):
+    export_png(spline, str(path), 300, 200, margin=10, tile_size=tile_size, **kwargs)
+    image, _ = read_png(path)
+    return image
+
+@pytest.mark.parametrize("closed", [False, True])
+@pytest.mark.parametrize("tile_size", [16, 37, 64])
+def test_tiles_match_a_single_tile(tmp_path, closed, tile_size):
+    spline = make_spline(closed)
+    whole = export(spline, tmp_path / "whole.png", 512)
+    tiled = export(spline, tmp_path / "tiled.png", tile_size)
+
+    assert tiled.shape == whole.shape == (200, 300, 3)
+    # the tiles only differ by rounding where their origins move the pixel math, never by a missing part
+    difference = np.abs(tiled.astype(np.int16) - whole)
+    assert difference.max() <= 1
+    assert (whole < 255).any() # something was drawn
+
+def test_zoomed_in_export(tmp_path):
+    # most of the spline is out of the picture, the tiles still agree at the seams
+    spline = make_spline(True)
+    bounds = (50, 20, 110, 60)
+    whole = export(spline, tmp_path / "whole.png", 512, bounds=bounds, line_width=0.5)
+    tiled = export(spline, tmp_path / "tiled.png", 25, bounds=bounds, line_width=0.5)
+    assert np.abs(tiled.astype(np.int16) - whole).max() <= 1
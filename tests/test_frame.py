@@ -0,0 +1,56 @@
+import numpy as np
+
+from src.frame import FrameBuffers
+from src.node import Node
+from src.smooth import auto_smooth
+from src.spline import Spline
+
+def make_spline(count, closed=False):
+    spline = Spline()
+    spline.extend([Node(100 * i, 50 * (i % 2)) for i in range(count)])
+    spline.set_closed(closed)
+    auto_smooth(spline)
+    return spline
+
+def storage(frame):
+    return [frame.nodes.data, frame.control_points.data, frame.handles.data, frame.curve.data]
+
+def test_update_layout():
+    spline = make_spline(4)
+    frame = FrameBuffers()
+    frame.update(spline)
+
+    assert frame.nodes.count == 4
+    assert frame.control_points.count == 6 # the end nodes only have one control point
+    assert frame.handles.count == 12
+    assert frame.curve.count == 10 # 3 cubics sharing their end points
+    assert np.array_equal(frame.curve.view()[::3], frame.nodes.view())
+
+def test_closed_chain_ends_at_the_start():
+    spline = make_spline(4, closed=True)
+    frame = FrameBuffers()
+    frame.update(spline)
+
+    assert frame.curve.count == 13 # 4 cubics
+    assert np.array_equal(frame.curve.view()[-1], frame.curve.view()[0])
+    start = spline.start
+    previous = (start._x + start.control_previous._x, start._y + start.control_previous._y)
+    assert np.allclose(frame.curve.view()[-2], previous)
+
+def test_update_reuses_the_buffers():
+    spline = make_spline(50)
+    frame = FrameBuffers()
+    frame.update(spline)
+    before = storage(frame)
+
+    # moving things around or drawing a smaller spline doesn't allocate
+    spline.node_at(3).x += 10
+    frame.update(spline)
+    frame.update(make_spline(10))
+    assert all(a is b for a, b in zip(storage(frame), before))
+    assert frame.nodes.count == 10
+
+    # only growing past the capacity does
+    frame.update(make_spline(500))
+    assert frame.nodes.data is not before[0]
+    assert frame.nodes.count == 500
@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.journal import (
+    JOURNAL_FILE, Document, EditJournal, apply_edit, document_from_spline, load_document, recover_spline
+)
+from src.node import Node
+from src.smooth import auto_smooth
+from src.spline import Spline
+
+def edit(spline: Spline, journal: EditJournal):
+    """Makes every kind of structural edit the app makes, recording them like the app does."""
+    for x, y in ((0, 0), (100, 0), (200, 50)):
+        spline.push_back(Node(x, y))
+        journal.record("push", side="back", x=x, y=y)
+    spline.push_front(Node(-100, 20))
+    journal.record("push", side="front", x=-100, y=20)
+
+    auto_smooth(spline)
+    journal.record("smooth")
+
+    node = spline.split_segment(1, 0.3)
+    previous, next = spline.neighbours(node)
+    journal.record(
+        "insert", index=2, x=node._x, y=node._y,
+        previous=[node.control_previous._x, node.control_previous._y],
+        next=[node.control_next._x, node.control_next._y],
+        before=[previous.control_next._x, previous.control_next._y],
+        after=[next.control_previous._x, next.control_previous._y]
+    )
+
+    spline.set_closed(True)
+    journal.record("close", closed=True)
+
+    previous, next = spline.neighbours(spline.node_at(0))
+    spline.delete_node(0)
+    journal.record(
+        "delete", index=0,
+        before=[previous.control_next._x, previous.control_next._y],
+        after=[next.control_previous._x, next.control_previous._y]
+    )
+
+def assert_same(document: Document, expected: Document):
+    assert document.closed == expected.closed
+    assert np.allclose(document.rows, expected.rows)
+
+@pytest.mark.parametrize("snapshot_every", (1, 3, 5000))
+def test_recovers_what_was_edited(tmp_path, snapshot_every):
+    spline = Spline()
+    journal = EditJournal(str(tmp_path), snapshot_every=snapshot_every, batch_size=2)
+    edit(spline, journal)
+    journal.close()
+
+    assert_same(load_document(str(tmp_path))[0], document_from_spline(spline))
+    assert_same(document_from_spline(recover_spline(str(tmp_path))), document_from_spline(spline))
+
+def test_picks_up_where_it_left_off(tmp_path):
+    journal = EditJournal(str(tmp_path))
+    journal.record("push", side="back", x=1, y=2)
+    journal.close()
+
+    journal = EditJournal(str(tmp_path))
+    assert len(journal.recovered) == 1
+    journal.record("push", side="back", x=3, y=4)
+    journal.close()
+    assert [row[:2] for row in load_document(str(tmp_path))[0].rows] == [[1, 2], [3, 4]]
+
+def test_reset_can_be_undone(tmp_path):
+    journal = EditJournal(str(tmp_path))
+    for x in range(3):
+        journal.record("push", side="back", x=x, y=0)
+    journal.record("reset")
+    journal.close()
+
+    assert load_document(str(tmp_path))[0].rows == []
+    assert len(load_document(str(tmp_path), before_reset=True)[0].rows) == 3
+
+def test_cut_off_line_ends_the_journal(tmp_path):
+    journal = EditJournal(str(tmp_path))
+    journal.record("push", side="back", x=1, y=2)
+    journal.close()
+    with open(os.path.join(tmp_path, JOURNAL_FILE), "a", encoding="utf-8") as f:
+        f.write('{"op":"push","side":"ba')
+
+    document, seq = load_document(str(tmp_path))
+    assert len(document.rows) == 1 and seq == 1
+
+def test_bad_entries_are_skipped(tmp_path):
+    journal = EditJournal(str(tmp_path))
+    journal.record("push", side="back", x=1, y=2)
+    journal.record("move", index=5, point="node", x=0, y=0)
+    journal.record("spin")
+    with pytest.warns(RuntimeWarning):
+        journal.close()
+    assert journal.error is None # the writer kept going
+
+    with pytest.warns(RuntimeWarning):
+        document, seq = load_document(str(tmp_path))
+    assert len(document.rows) == 1 and seq == 3
+
+def test_bad_entry_leaves_the_document_alone():
+    document = Document([[0.0, 0.0, 0.0, 50.0, -0.0, -50.0, 1.0, 0.0]])
+    with pytest.raises(ValueError):
+        apply_edit(document, {"op": "delete", "index": 3, "before": None, "after": None})
+    assert len(document.rows) == 1
+
+@pytest.mark.parametrize("closed", (False, True))
+def test_smooth_replays_like_the_spline(closed):
+    spline = Spline()
+    document = Document()
+    for x, y in ((0, 0), (100, 30), (180, -40), (260, 10), (300, 90)):
+        spline.push_back(Node(x, y))
+        apply_edit(document, {"op": "push", "side": "back", "x": x, "y": y})
+    spline.set_closed(closed)
+    apply_edit(document, {"op": "close", "closed": closed})
+
+    auto_smooth(spline)
+    apply_edit(document, {"op": "smooth"})
+    assert_same(document, document_from_spline(spline))
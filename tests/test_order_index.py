@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from src.order_index import OrderIndex
+
+def test_matches_a_list():
+    rng = random.Random(1)
+    index, expected, entries = OrderIndex(), [], {}
+    for value in range(2000):
+        k = rng.randrange(len(expected) + 1)
+        entries[value] = index.insert(k, value)
+        expected.insert(k, value)
+        if rng.random() < 0.3:
+            k = rng.randrange(len(expected))
+            assert index.pop(k) == expected.pop(k)
+
+    assert len(index) == len(expected)
+    assert list(index) == expected
+    assert [index[k] for k in range(len(expected))] == expected
+    assert index[-1] == expected[-1]
+    for k, value in enumerate(expected):
+        assert index.index(entries[value]) == k
+
+def test_extend_appends_in_order():
+    index = OrderIndex(range(5))
+    entries = index.extend(range(5, 1000))
+    assert list(index) == list(range(1000))
+    assert [index.index(e) for e in entries] == list(range(5, 1000))
+
+def test_out_of_range():
+    index = OrderIndex([1, 2])
+    with pytest.raises(IndexError):
+        index[2]
+    with pytest.raises(IndexError):
+        index.insert(3, 0)
+    with pytest.raises(IndexError):
+        index.pop(2)
+    index.clear()
+    assert len(index) == 0 and list(index) == []
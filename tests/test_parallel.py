@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from engine.curves import cubic_bounding_boxes, evaluate_bezier
+from engine.parallel import ParallelEvaluator
+
+def chain(points):
+    """Straight cubic segments through points, one after the other."""
+    points = np.asarray(points, dtype=np.float64)
+    a, b = points[:-1], points[1:]
+    return np.stack((a, a + (b - a) / 3, a + 2 * (b - a) / 3, b), axis=1)
+
+@pytest.fixture(scope="module")
+def segments():
+    rng = np.random.default_rng(0)
+    return rng.random((101, 4, 2)) * 1000
+
+@pytest.fixture(scope="module")
+def evaluator(segments):
+    with ParallelEvaluator(segments, workers=2, chunks_per_worker=3) as evaluator:
+        yield evaluator
+
+def test_matches_serial(evaluator, segments):
+    points = evaluate_bezier(segments, 16)
+    assert np.allclose(evaluator.tessellate(16), points)
+    assert np.allclose(evaluator.bounding_boxes(), cubic_bounding_boxes(segments))
+
+    steps = np.diff(evaluate_bezier(segments, 64), axis=1)
+    assert np.allclose(evaluator.lengths(64), np.hypot(steps[..., 0], steps[..., 1]).sum(axis=1))
+
+def test_result_outlives_the_evaluator(segments):
+    with ParallelEvaluator(segments, workers=2) as evaluator:
+        points = evaluator.tessellate(8)
+    assert np.allclose(points[-1], evaluate_bezier(segments[-1:], 8)[0])
+
+def test_line_through_nodes_hits_once():
+    zigzag = chain(((0, 0), (3, 3), (6, 0), (9, 3)))
+    with ParallelEvaluator(zigzag, workers=2, chunks_per_worker=2) as evaluator:
+        joint = evaluator.intersect_line((3, -1), (3, 5), 8)
+        end = evaluator.intersect_line((9, -1), (9, 5), 8)
+    # the node ends one segment and starts the next, either can report it but only one does
+    assert len(joint) == 1 and np.allclose(joint[0, 2:], (3, 3))
+    assert np.allclose(end, [(2, 1, 9, 3)])
+
+def test_crossings_between_nodes():
+    zigzag = chain(((0, 0), (3, 3), (6, 0), (9, 3)))
+    with ParallelEvaluator(zigzag, workers=2) as evaluator:
+        hits = evaluator.intersect_line((0, 1), (9, 1), 8)
+        short = evaluator.intersect_line((0, 1), (2, 1), 8)
+    assert np.allclose(hits[:, 2:], ((1, 1), (5, 1), (7, 1)))
+    assert np.allclose(short[:, 2:], ((1, 1),))
+
+def test_closed_path_start_hits_once():
+    square = chain(((0, 0), (4, 0), (4, 4), (0, 4), (0, 0)))
+    with ParallelEvaluator(square, closed=True, workers=2) as evaluator:
+        hits = evaluator.intersect_line((-1, -1), (1, 1), 8)
+    assert np.allclose(hits, [(0, 0, 0, 0)])
+
+def test_open_path_back_at_its_start_hits_twice():
+    # ending where it started doesn't make a path closed, its start and end are both on the line
+    square = chain(((0, 0), (4, 0), (4, 4), (0, 4), (0, 0)))
+    with ParallelEvaluator(square, workers=2) as evaluator:
+        hits = evaluator.intersect_line((-1, -1), (1, 1), 8)
+    assert np.allclose(hits, [(0, 0, 0, 0), (3, 1, 0, 0)])
+
+@pytest.mark.parametrize("direction", [1, -1])
+def test_tangential_touch_hits_once(direction):
+    # an arch whose top, y = 12 t (1 - t) = 3 at t = 0.5, is a flattened point right on the line
+    arch = np.array([[(0, 0), (0, 4), (4, 4), (4, 0)]], dtype=np.float64)
+    peak = chain(((0, 0), (3, 3), (6, 0)))
+    p, q = (-direction * 10, 3), (direction * 10, 3)
+    with ParallelEvaluator(arch, workers=1) as evaluator:
+        arch_hits = evaluator.intersect_line(p, q, 8)
+    with ParallelEvaluator(peak, workers=2) as evaluator:
+        peak_hits = evaluator.intersect_line(p, q, 8)
+    # touching the line from either side is the same single hit, whichever way the line goes
+    assert np.allclose(arch_hits, [(0, 0.5, 2, 3)])
+    assert np.allclose(peak_hits, [(1, 0, 3, 3)])
@@ -0,0 +1,57 @@
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from engine.png import PngWriter, write_png
+
+def read_png(path):
+    """Decodes the 8 bit RGB, unfiltered PNGs PngWriter writes, checking every chunk's CRC."""
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+
+    position, chunks = 8, []
+    while position < len(data):
+        length, kind = struct.unpack(">I4s", data[position:position + 8])
+        body = data[position + 8:position + 8 + length]
+        crc, = struct.unpack(">I", data[position + 8 + length:position + 12 + length])
+        assert crc == zlib.crc32(kind + body)
+        chunks.append((kind, body))
+        position += 12 + length
+
+    assert chunks[0][0] == b"IHDR" and chunks[-1][0] == b"IEND"
+    width, height = struct.unpack(">II", chunks[0][1][:8])
+    raw = zlib.decompress(b"".join(body for kind, body in chunks if kind == b"IDAT"))
+    rows = np.frombuffer(raw, dtype=np.uint8).reshape(height, 1 + 3 * width)
+    assert (rows[:, 0] == 0).all()
+    return rows[:, 1:].reshape(height, width, 3), chunks
+
+def test_round_trip_in_bands(tmp_path):
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (300, 200, 3), dtype=np.uint8)
+    path = tmp_path / "bands.png"
+    with PngWriter(str(path), 200, 300) as writer:
+        for y in range(0, 300, 64):
+            writer.write_rows(image[y:y + 64])
+
+    decoded, chunks = read_png(path)
+    assert np.array_equal(decoded, image)
+    assert sum(kind == b"IDAT" for kind, _ in chunks) > 1 # random pixels don't compress, the data is split
+
+def test_write_png(tmp_path):
+    image = np.zeros((3, 4, 3), dtype=np.uint8)
+    image[1, 2] = (255, 128, 1)
+    write_png(str(tmp_path / "small.png"), image)
+    assert np.array_equal(read_png(tmp_path / "small.png")[0], image)
+
+def test_wrong_row_count(tmp_path):
+    writer = PngWriter(str(tmp_path / "short.png"), 4, 4)
+    with pytest.raises(ValueError):
+        writer.write_rows(np.zeros((2, 5, 3)))
+    writer.write_rows(np.zeros((2, 4, 3)))
+    with pytest.raises(ValueError):
+        writer.write_rows(np.zeros((3, 4, 3)))
+    with pytest.raises(ValueError):
+        writer.close()
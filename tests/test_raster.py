@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from engine import colors
+from engine.raster import Raster
+
+def blank(width=32, height=32, **kwargs):
+    """A black raster, shapes are drawn white so the red channel is the coverage."""
+    return Raster(width, height, background=colors.BLACK, **kwargs)
+
+def coverage(raster):
+    return raster.pixels[..., 0].astype(np.float64)
+
+@pytest.mark.parametrize("center", [(10, 10), (10.25, 9.5), (20.7, 13.1)])
+@pytest.mark.parametrize("size", [1, 3, 4.5])
+def test_square_point_coverage_is_its_area(center, size):
+    raster = blank()
+    raster.draw_points([center], size, colors.WHITE)
+    assert coverage(raster).sum() == pytest.approx(size * size, abs=1e-4)
+
+def test_round_point_is_about_a_disc():
+    raster = blank()
+    raster.draw_points([(16, 16)], 10, colors.WHITE, round=True)
+    assert coverage(raster).sum() == pytest.approx(np.pi * 25, rel=0.02)
+    # inscribed in the square of the same size
+    square = blank()
+    square.draw_points([(16, 16)], 10, colors.WHITE)
+    assert np.all(coverage(raster) <= coverage(square) + 1e-6)
+
+def test_y_goes_up_on_the_canvas():
+    raster = blank(32, 16)
+    raster.draw_points([(3.5, 14.5)], 1, colors.WHITE)
+    # near the top of the canvas is near the first row of the image
+    assert np.argwhere(coverage(raster) > 0.99).tolist() == [[1, 3]]
+
+def test_origin_and_scale():
+    raster = blank(40, 40, origin=(100, 200), scale=2)
+    raster.draw_points([(105.25, 210.25)], 1, colors.WHITE)
+    # (5.25, 10.25) canvas units from the origin, twice that in pixels and flipped
+    assert np.argwhere(coverage(raster) > 0.99).tolist() == [[40 - 21, 10]]
+    assert raster.to_pixels([(100, 200)]).tolist() == [[0, 40]]
+
+@pytest.mark.parametrize("width", [1, 2.5, 4])
+@pytest.mark.parametrize("y", [16, 16.3])
+def test_line_width(width, y):
+    raster = blank()
+    raster.draw_lines([(4, y)], [(28, y)], width, colors.WHITE)
+    columns = coverage(raster).sum(axis=0)
+    # away from the caps, each column is crossed by exactly `width` pixels of stroke
+    assert np.allclose(columns[8:24], width, atol=1e-4)
+    assert columns[:2].sum() == 0 and columns[30:].sum() == 0
+
+def test_overlapping_lines_are_one_stroke():
+    raster = blank()
+    raster.draw_lines([(4, 16), (10, 16)], [(20, 16), (28, 16)], 2, colors.WHITE)
+    assert coverage(raster).max() <= 1
+    assert np.allclose(coverage(raster).sum(axis=0)[8:24], 2, atol=1e-4)
+
+def test_triangles_hide_shared_edges():
+    raster = blank()
+    square = [(4, 4), (20, 4), (20, 20)], [(4, 4), (20, 20), (4, 20)]
+    raster.draw_triangles(square, colors.WHITE)
+    covered = coverage(raster)
+    # pixel aligned, so the square covers exactly its 16 x 16 pixels, the diagonal included
+    assert covered.sum() == pytest.approx(256, abs=1e-3)
+    assert np.allclose(covered[12:28, 4:20], 1)
+
+def test_coverage_blends_the_color():
+    raster = Raster(8, 8, background=colors.WHITE)
+    # half of a pixel wide column
+    raster.draw_triangles([[(2, 0), (2.5, 0), (2.5, 8)], [(2, 0), (2.5, 8), (2, 8)]], (0, 0, 1))
+    assert np.allclose(raster.pixels[3, 2], [0.5, 0.5, 1], atol=1e-3)
+    assert np.allclose(raster.pixels[3, 4], [1, 1, 1])
@@ -0,0 +1,52 @@
+from engine.recording import InputEvent, InputRecorder, read_recording
+from engine.replay import ReplayResult, replay
+
+class FakeInput:
+    def __init__(self, app):
+        self.app = app
+
+    def dispatch(self, name, *args):
+        self.app.events.append((name, args))
+
+class FakeApp:
+    """Just enough of engine.App for a replay, the state is the events seen so far."""
+    def __init__(self):
+        self.input_manager = FakeInput(self)
+        self.events = []
+        self.frames = []
+
+    def render_frame(self):
+        self.frames.append(len(self.events))
+
+    def state(self):
+        return list(self.events)
+
+def test_replays_events_in_their_frames(tmp_path):
+    path = str(tmp_path / "session.rec")
+    recorder = InputRecorder(path)
+    recorder.write("left_click", (10.5, 20.0))
+    recorder.write("frame", ())
+    recorder.write("mouse_move", (11.0, 21.0))
+    recorder.write("key_press", (69, 26, 0))
+    recorder.write("frame", ())
+    recorder.write("scroll", (0, 1)) # not replayable, dropped
+    recorder.close()
+
+    app = FakeApp()
+    result = replay(app, path)
+    assert app.frames == [1, 3]
+    assert result.frame_count == 2
+    assert result.final_state == [("left_click", (10.5, 20.0)), ("mouse_move", (11.0, 21.0)), ("key_press", (69, 26, 0))]
+    assert [e.name for e in read_recording(path)] == ["left_click", "frame", "mouse_move", "key_press", "frame"]
+
+def test_same_recording_same_state():
+    events = [InputEvent(0, "left_click", (1.0, 2.0)), InputEvent(0, "frame", ())] * 3
+    assert replay(FakeApp(), events).final_state == replay(FakeApp(), events).final_state
+
+def test_budget():
+    result = ReplayResult([0.010, 0.012, 0.030, 0.011])
+    assert result.over_budget(0.016) == [2]
+    assert not result.within_budget(0.016)
+    assert result.within_budget(0.031)
+    assert result.within_budget(0.016, p=50)
+    assert ReplayResult([]).within_budget(0)
@@ -0,0 +1,116 @@
+from math import pi
+
+import numpy as np
+import pytest
+
+from src.frame import FrameBuffers
+from src.journal import document_from_spline
+from src.node import Node
+from src.selection import Selection
+from src.smooth import auto_smooth
+from src.spline import Spline
+
+def make_spline(closed=False, count=6):
+    spline = Spline()
+    spline.extend([Node(100 * i, 50 * (i % 2)) for i in range(count)])
+    spline.set_closed(closed)
+    auto_smooth(spline)
+    return spline
+
+def rows(spline):
+    return np.array(document_from_spline(spline).rows)
+
+def test_from_box():
+    spline = make_spline()
+    selection = Selection.from_box(spline, 120, -10, 350, 60)
+    assert [n._x for n in selection.nodes] == [200, 300]
+    # a control point of an unselected node that reaches into the box is selected on its own
+    assert selection.control_points == [spline.node_at(1).control_next]
+    assert spline.node_at(2).control_next in selection # the selected nodes' control points come with them
+    assert len(selection) == 3
+    assert Selection.from_box(spline, 1000, 1000, 1100, 1100) is None
+
+@pytest.mark.parametrize("transform", (
+    lambda s: s.translate(30, -20),
+    lambda s: s.rotate(pi / 3, (10, 20)),
+    lambda s: s.scale(2.5, (150, 0)),
+    lambda s: s.apply(((1, 0.5), (0, 1)), (5, 5))
+))
+def test_transforms_are_relative_to_the_gesture_start(transform):
+    spline = make_spline()
+    before = rows(spline)
+    selection = Selection.from_box(spline, -10, -10, 250, 60)
+
+    transform(selection)
+    selection.write()
+    assert not np.allclose(rows(spline), before)
+
+    # every apply starts from begin(), the identity brings everything back
+    selection.apply(np.identity(2))
+    selection.end_gesture()
+    assert np.allclose(rows(spline), before)
+
+def test_nodes_are_written_when_the_gesture_ends():
+    spline = make_spline()
+    selection = Selection.from_box(spline, -10, -10, 50, 10)
+    node = selection.nodes[0]
+    selection.translate(10, 0)
+    assert node._x == 0
+    selection.end_gesture()
+    assert node._x == 10
+    assert selection.last_transform is None
+
+def test_scale_and_rotate_the_offsets():
+    spline = make_spline()
+    node = spline.node_at(2)
+    offset = (node.control_next._x, node.control_next._y)
+    selection = Selection([node])
+    selection.rotate(pi / 2)
+    selection.end_gesture()
+    assert np.allclose((node.control_next._x, node.control_next._y), (-offset[1], offset[0]))
+    assert np.allclose((node.control_previous._x, node.control_previous._y), (offset[1], -offset[0]))
+
+def test_lone_control_points_mirror_their_pair():
+    spline = make_spline()
+    node = spline.node_at(2)
+    control = node.control_next
+    absolute = np.array((node._x + control._x, node._y + control._y))
+    selection = Selection([], [control])
+
+    selection.translate(7, -3)
+    selection.end_gesture()
+    assert (node._x, node._y) == (200, 0)
+    assert np.allclose((node._x + control._x, node._y + control._y), absolute + (7, -3))
+    assert np.allclose((node.control_previous._x, node.control_previous._y), (-control._x, -control._y))
+
+def test_begin_picks_up_edits_made_since():
+    spline = make_spline()
+    selection = Selection.from_box(spline, -10, -10, 250, 60)
+    for node in spline:
+        node.control_next._x += 5
+        node.control_previous._x -= 5
+    smoothed = rows(spline)
+
+    selection.begin()
+    selection.scale(2, (0, 0))
+    selection.apply(np.identity(2))
+    selection.end_gesture()
+    assert np.allclose(rows(spline), smoothed)
+
+@pytest.mark.parametrize("closed", (False, True))
+@pytest.mark.parametrize("box", ((-10, -10, 250, 60), (150, -60, 600, 10), (-10, 40, 600, 200)))
+def test_frame_buffers_follow_the_gesture(closed, box):
+    spline = make_spline(closed)
+    frame = FrameBuffers()
+    frame.update(spline)
+    selection = Selection.from_box(spline, *box)
+    found = frame.locate(spline, selection.affected)
+
+    selection.rotate(0.7, (123, 45))
+    frame.write_nodes(found, *selection.affected_values())
+    selection.end_gesture()
+
+    expected = FrameBuffers()
+    expected.update(spline)
+    for name in ("nodes", "control_points", "handles", "curve"):
+        assert np.allclose(getattr(frame, name).view(), getattr(expected, name).view()), name
@@ -0,0 +1,40 @@
+import numpy as np
+
+from src.smooth import _thomas, solve_closed, solve_window
+
+def tridiagonal(lower, diagonal, upper):
+    return np.diag(diagonal) + np.diag(lower[1:], -1) + np.diag(upper[:-1], 1)
+
+def test_thomas_matches_a_dense_solve():
+    rng = np.random.default_rng(0)
+    n = 50
+    lower, upper = rng.random(n), rng.random(n)
+    diagonal = 4 + rng.random(n) # diagonally dominant, like the smoothing systems
+    rhs = rng.random((n, 2))
+    expected = np.linalg.solve(tridiagonal(lower, diagonal, upper), rhs)
+    assert np.allclose(_thomas(lower, diagonal, upper, rhs), expected)
+
+def test_closed_path_solves_the_cyclic_system():
+    rng = np.random.default_rng(1)
+    for n in (3, 4, 17, 200):
+        knots = rng.random((n, 2)) * 100
+        matrix = 4 * np.eye(n) + np.roll(np.eye(n), 1, axis=1) + np.roll(np.eye(n), -1, axis=1)
+        expected = np.linalg.solve(matrix, 4 * knots + 2 * np.roll(knots, -1, axis=0))
+        assert np.allclose(solve_closed(knots), expected)
+
+def test_two_node_closed_path():
+    knots = np.array(((0.0, 0.0), (10.0, 5.0)))
+    first = solve_closed(knots)
+    assert np.allclose(np.array(((4, 2), (2, 4))) @ first, 4 * knots + 2 * knots[::-1])
+
+def test_open_path_is_c2():
+    rng = np.random.default_rng(2)
+    knots = rng.random((8, 2)) * 100
+    first = solve_window(knots, starts_open=True, ends_open=True)
+    second = np.concatenate((2 * knots[1:-1] - first[1:], [(knots[-1] + first[-1]) / 2]))
+
+    # the second derivatives at both sides of the inner knots match, they're 0 at the ends
+    at_end = knots[1:] - 2 * second + first
+    at_start = knots[:-1] - 2 * first + second
+    assert np.allclose(at_end[:-1], at_start[1:])
+    assert np.allclose(at_start[0], 0) and np.allclose(at_end[-1], 0)
@@ -0,0 +1,90 @@
+import time
+
+import numpy as np
+import pytest
+
+from engine import PointBuffer
+from engine.curves import tessellate_bezier_chain
+from src.tessellation import TessellationWorker
+
+def chain(offset, curves=3):
+    buffer = PointBuffer()
+    buffer.reserve(3 * curves + 1)
+    buffer.count = 3 * curves + 1
+    buffer.data[:buffer.count] = np.arange(2 * buffer.count).reshape(-1, 2) + offset
+    return buffer
+
+def expected(controls, num_segments):
+    out = PointBuffer()
+    tessellate_bezier_chain(controls, out, 3, num_segments)
+    return out.view()
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail("the tessellation worker didn't get there in time")
+        time.sleep(0.001)
+
+def wait_for_front(worker, generation):
+    """Polls the worker like the render thread does until the front buffer holds the given snapshot."""
+    wait_until(lambda: worker.front() is not None and worker.front_generation == generation)
+    return worker.front()
+
+@pytest.fixture
+def worker():
+    worker = TessellationWorker(num_segments=8)
+    yield worker
+    worker.stop()
+
+def test_front_is_empty_until_the_first_snapshot(worker):
+    assert worker.front().count == 0
+    assert worker.front_generation == 0
+    assert not worker.is_busy()
+
+def test_only_the_newest_snapshot_is_published(worker):
+    first = chain(0)
+    assert worker.submit(first) == 1
+    # the back buffer is done, the worker now waits for the render thread to take it
+    wait_until(lambda: worker._ready)
+
+    stale, newest = chain(100), chain(200)
+    assert worker.submit(stale) == 2
+    assert worker.submit(newest) == 3
+
+    front = worker.front()
+    assert worker.front_generation == 1
+    assert np.array_equal(front.view(), expected(first, 8))
+
+    wait_until(lambda: worker.front() is not front)
+    assert worker.front_generation == 3 # snapshot 2 was replaced before it got tessellated
+    assert np.array_equal(worker.front().view(), expected(newest, 8))
+    wait_until(lambda: not worker.is_busy())
+
+def test_front_buffer_is_not_written_while_held(worker):
+    worker.submit(chain(0))
+    front = wait_for_front(worker, 1)
+    drawn = front.view().copy()
+
+    worker.submit(chain(50, curves=5))
+    wait_until(lambda: worker._ready)
+    # the new geometry went into the other buffer
+    assert np.array_equal(front.view(), drawn)
+
+    swapped = worker.front()
+    assert swapped is not front
+    assert worker.front_generation == 2
+    assert swapped.count == 5 * worker.strip_length
+
+def test_submit_copies_the_controls(worker):
+    controls = chain(0)
+    worker.submit(controls)
+    tessellated = expected(controls, 8)
+    controls.data[:] = -1 # the caller reuses its buffer right away
+    assert np.array_equal(wait_for_front(worker, 1).view(), tessellated)
+
+def test_stop_ends_the_thread():
+    worker = TessellationWorker()
+    worker.submit(chain(0))
+    worker.stop()
+    assert not worker._thread.is_alive()
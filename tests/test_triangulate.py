@@ -0,0 +1,30 @@
+import numpy as np
+
+from engine.triangulate import signed_area, triangulate_polygon
+
+def triangle_areas(points, triangles):
+    a, b, c = (points[triangles[:, i]] for i in range(3))
+    return 0.5 * ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]))
+
+def check(points):
+    triangles = triangulate_polygon(points)
+    areas = triangle_areas(points, triangles)
+    assert triangles.shape == (len(points) - 2, 3)
+    assert (areas >= -1e-9).all() # counter clockwise
+    assert np.isclose(areas.sum(), abs(signed_area(points)))
+
+def test_star():
+    rng = np.random.default_rng(0)
+    angles = np.sort(rng.random(300)) * 2 * np.pi
+    radii = 50 + 50 * rng.random(300)
+    check(np.column_stack((np.cos(angles), np.sin(angles))) * radii[:, None])
+
+def test_comb_either_orientation():
+    # a comb with deep teeth, most vertices are reflex
+    top = [(x, 10.0 if x % 2 else 1.0) for x in range(40)]
+    comb = np.array([(0.0, 0.0), (39.0, 0.0)] + top[::-1], dtype=np.float64)
+    check(comb)
+    check(comb[::-1])
+
+def test_too_few_points():
+    assert triangulate_polygon([(0, 0), (1, 0)]).shape == (0, 3)